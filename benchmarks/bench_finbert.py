@@ -0,0 +1,82 @@
+"""
+Vergleicht die FinBERT-Backends (torch, torch-int8, onnx) auf einem festen Headline-Set:
+Ladezeit, Latenz pro Scoring-Aufruf, maximaler RSS und Abweichung zum fp32-Torch-Ergebnis.
+Jedes Backend läuft in einem eigenen Prozess, damit RSS und Ladezeit nicht verfälscht werden.
+
+    python benchmarks/bench_finbert.py --runs 20 --threads 4
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+HEADLINES = (Path(__file__).parent / "fixtures" / "headlines.txt").read_text().splitlines()
+
+
+def _measure(backend_name, threads, runs, queue):
+    from helper import finbert_utils
+
+    start = time.perf_counter()
+    backend = finbert_utils.BACKENDS[backend_name](threads=threads)
+    load_s = time.perf_counter() - start
+
+    backend.score(HEADLINES)  # Warm-up
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        probs = backend.score(HEADLINES)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    queue.put({
+        "backend": backend_name,
+        "load_s": round(load_s, 2),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "max_ms": round(max(latencies), 1),
+        "rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "probs": probs,
+    })
+
+
+def run(backends, threads, runs):
+    ctx = mp.get_context("spawn")
+    results = []
+    for name in backends:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_measure, args=(name, threads, runs, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+    return results
+
+
+def compare(results, tolerance):
+    """Label-Übereinstimmung und maximale Wahrscheinlichkeits-Abweichung zum ersten Backend."""
+    baseline = results[0]["probs"]
+    labels = lambda probs: [max(range(3), key=p.__getitem__) for p in probs]
+    for result in results:
+        diff = max(abs(a - b) for pa, pb in zip(result["probs"], baseline) for a, b in zip(pa, pb))
+        agree = sum(a == b for a, b in zip(labels(result.pop("probs")), labels(baseline)))
+        result["label_agreement"] = f"{agree}/{len(baseline)}"
+        result["max_prob_diff"] = round(diff, 4)
+        result["within_tolerance"] = diff <= tolerance
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="torch,torch-int8,onnx")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+
+    results = compare(run(args.backends.split(","), args.threads, args.runs), args.tolerance)
+    columns = ["backend", "load_s", "p50_ms", "max_ms", "rss_mb", "label_agreement", "max_prob_diff", "within_tolerance"]
+    print(" | ".join(columns))
+    for result in results:
+        print(" | ".join(str(result[c]) for c in columns))
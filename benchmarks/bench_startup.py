@@ -0,0 +1,128 @@
+"""
+Misst die Startzeit des Live-Bots: vom Prozessstart bis zum Abonnieren des Trade-Streams.
+Jeder Lauf ist ein frischer Interpreter (--child) mit Fake-Clients aus der Registry
+(helper.config) – kein Netzwerk, keine API-Keys nötig. Das FinBERT-Warm-up läuft im Bot im
+Hintergrund weiter und zählt nicht zur Startzeit.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget 1.0   # Exit-Code 1, wenn der Median darüber liegt
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = Path(__file__).parent / "fixtures"
+MARKER = "STARTUP "
+
+
+def child():
+    started = time.perf_counter()
+    import asyncio
+    from datetime import datetime, timedelta
+    from types import SimpleNamespace
+
+    workdir = Path(tempfile.mkdtemp(prefix="mi_trade_startup_"))
+    os.environ.setdefault("API_KEY", "bench")
+    os.environ.setdefault("API_SECRET", "bench")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("JOURNAL_DIR", str(workdir))
+    os.environ.setdefault("CALENDAR_CACHE_FILE", str(workdir / "market_calendar.json"))
+    os.environ.setdefault("METRICS_INTERVAL", "0")
+    os.environ.setdefault("SENTIMENT_SERVICE", "off")
+    os.environ.setdefault("NEWSAPI_URL", "http://127.0.0.1:9")  # News-Abfragen scheitern sofort
+    sys.path.insert(0, str(ROOT / "src"))
+
+    from helper import config
+    import pandas as pd
+    import pytz
+
+    class FakeClient:
+        def get_calendar(self, request):
+            # laufende Sitzung (Kalenderzeiten wie bei Alpaca: New Yorker Ortszeit ohne Zeitzone)
+            now = datetime.now(pytz.timezone("America/New_York")).replace(tzinfo=None)
+            return [SimpleNamespace(date=now.date(), open=now - timedelta(hours=1), close=now + timedelta(hours=6))]
+
+        def get_all_positions(self):
+            return []
+
+        def get_account(self):
+            return SimpleNamespace(cash="100000")
+
+    class FakeBarStore:
+        def get_bars(self, symbols, start, end, timeframe):
+            bars = pd.read_csv(FIXTURES / "bars_TSLA_5min.csv", parse_dates=["timestamp"])
+            return bars.assign(symbol="TSLA")
+
+    class FakeStream:
+        def subscribe_trades(self, handler, *symbols):
+            timings["subscribed_s"] = time.perf_counter() - started
+
+        def subscribe_trade_updates(self, handler):
+            pass
+
+        async def _run_forever(self):
+            if self is stream:
+                print(MARKER + json.dumps(timings), flush=True)
+                bot.scheduler.stop()
+                bot.supervisor.stop()
+            else:
+                await asyncio.sleep(3600)
+
+    config.override("trading", FakeClient())
+    config.override("bar_store", FakeBarStore())
+    stream = config.override("stream", FakeStream())
+    config.override("trading_stream", FakeStream())
+
+    timings = {}
+    import_start = time.perf_counter()
+    import live_websocket_bot as lwb
+    timings["import_s"] = time.perf_counter() - import_start
+
+    lwb.LOG_FILE = workdir / "order_log.csv"
+    bot = lwb.LiveWebSocketBot()
+    timings["init_s"] = time.perf_counter() - started
+    asyncio.run(bot.start())
+    bot.stop()
+
+
+def run_once():
+    """Startet einen Kind-Prozess; gibt dessen Zeiten plus die Wanduhr-Zeit bis zum Abo zurück."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, __file__, "--child"], stdout=subprocess.PIPE, text=True)
+    result = None
+    for line in process.stdout:
+        if line.startswith(MARKER):
+            result = json.loads(line[len(MARKER):])
+            result["boot_to_subscribe_s"] = time.perf_counter() - start
+    process.wait()
+    if result is None:
+        raise RuntimeError(f"Kind-Prozess ohne Ergebnis beendet (Exit-Code {process.returncode})")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, help="maximal erlaubter Median boot_to_subscribe in Sekunden")
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        sys.exit(0)
+
+    runs = [run_once() for _ in range(args.runs)]
+    report = {key: round(statistics.median(r[key] for r in runs), 3) for key in runs[0]}
+    for key, value in report.items():
+        print(f"{key:22s} {value:8.3f} s")
+
+    if args.budget and report["boot_to_subscribe_s"] > args.budget:
+        print(f"\nStartzeit über Budget ({args.budget:.2f} s)")
+        sys.exit(1)
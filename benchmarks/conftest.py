@@ -0,0 +1,107 @@
+"""
+Offline-Benchmarks der Trading-Pipeline (pytest-benchmark) auf den festen Fixtures
+(benchmarks/fixtures) mit Fake-Clients statt Alpaca/NewsAPI – kein Netzwerk, keine API-Keys nötig.
+
+Läufe landen versioniert unter benchmarks/results/<Maschine>/; die eingecheckte Baseline ist
+0001_baseline.json. Vergleich (Exit-Code ≠ 0 bei mehr als 15 % Verlangsamung im Median):
+
+    pytest benchmarks --benchmark-autosave --benchmark-compare=0001 --benchmark-compare-fail=median:15%
+    pytest benchmarks --benchmark-save=baseline   # neue Baseline nach gewollten Änderungen
+
+Die µs-Benchmarks schwanken auf geteilten Maschinen stärker; dort besser `min:20%` vergleichen.
+Der FinBERT-Benchmark wird übersprungen, wenn das Modell nicht ladbar ist (ohne Netz: HF_HUB_OFFLINE=1).
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = Path(__file__).parent / "fixtures"
+RESULTS = Path(__file__).parent / "results"
+SYMBOL = "TSLA"
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+# vor den Bot-Imports: Dummy-Keys (keine Requests), Journal in ein Temp-Verzeichnis, wenig Log-Ausgabe
+WORKDIR = Path(tempfile.mkdtemp(prefix="mi_trade_bench_"))
+os.environ.setdefault("API_KEY", "bench")
+os.environ.setdefault("API_SECRET", "bench")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("JOURNAL_DIR", str(WORKDIR))
+os.environ.setdefault("METRICS_INTERVAL", "0")
+os.environ.setdefault("SENTIMENT_SERVICE", "off")
+sys.path.insert(0, str(ROOT / "src"))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Ergebnisse im Repo statt in ./.benchmarks, damit Baseline und Vergleich unabhängig vom Arbeitsverzeichnis sind
+    if getattr(config.option, "benchmark_storage", None) == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{RESULTS}"
+
+
+class FakeTradingClient:
+    """
+    Ersetzt den Alpaca-TradingClient: leeres Depot, Orders werden gezählt und – wenn ein Ledger
+    angehängt ist – sofort zum zuletzt gesetzten `price` gebucht (statt über Trade-Updates).
+    """
+
+    def __init__(self, cash=100_000):
+        self.cash = cash
+        self.orders = []
+        self.ledger = None
+        self.price = None
+
+    def get_all_positions(self):
+        return []
+
+    def get_account(self):
+        return SimpleNamespace(cash=str(self.cash))
+
+    def get_open_position(self, symbol):
+        raise LookupError(symbol)
+
+    def get_orders(self, request=None):
+        return []
+
+    def submit_order(self, order):
+        self.orders.append(order)
+        if self.ledger is not None:
+            side = getattr(order.side, "value", order.side)
+            self.ledger.apply_fill(order.symbol, side, float(order.qty), self.price)
+        return SimpleNamespace(id=str(len(self.orders)), client_order_id=getattr(order, "client_order_id", None),
+                               status="filled")
+
+
+@pytest.fixture(scope="session")
+def bars():
+    return pd.read_csv(FIXTURES / f"bars_{SYMBOL}_5min.csv", parse_dates=["timestamp"])
+
+
+@pytest.fixture(scope="session")
+def trades():
+    df = pd.read_csv(FIXTURES / f"trades_{SYMBOL}.csv.gz")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+    return [
+        SimpleNamespace(symbol=SYMBOL, price=float(t.price), size=float(t.size), timestamp=t.timestamp.to_pydatetime())
+        for t in df.itertuples(index=False)
+    ]
+
+
+@pytest.fixture(scope="session")
+def headlines():
+    return (FIXTURES / "headlines.txt").read_text().splitlines()
+
+
+@pytest.fixture
+def fake_client():
+    from helper import config
+
+    saved = dict(config._clients)
+    yield config.override("trading", FakeTradingClient())
+    config._clients.clear()
+    config._clients.update(saved)
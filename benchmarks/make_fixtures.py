@@ -0,0 +1,100 @@
+"""
+Erzeugt die festen Markt-Fixtures für benchmarks/test_pipeline.py (deterministisch, Seed 42):
+5-Minuten-Bars als Vorlauf für Indikatoren/Kerzen und die darauf folgenden Einzel-Trades.
+Die Bars haben Eröffnungslücken und unabhängige Dochte, zusätzlich ist alle paar Bars ein
+Kerzenmuster eingestreut (Engulfing, Hammer/Shooting Star, Three Soldiers/Crows) – auch im
+Trade-Teil, damit on_trade tatsächlich Kauf-/Verkaufsentscheidungen und Orders durchläuft.
+
+    python benchmarks/make_fixtures.py
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SYMBOL = "TSLA"
+BAR = pd.Timedelta(minutes=5)
+SEEDED_PATTERNS = ["bullish_engulfing", "bearish_engulfing", "hammer", "shooting_star",
+                   "three_white_soldiers", "three_black_crows"]
+
+
+def pattern_bars(name, p, s):
+    """OHLC-Tupel eines Musters ab Preis p mit Körpergröße s (erfüllen candlestick_patterns exakt)."""
+    def bar(o, c, upper=0.1, lower=0.1):
+        return o, max(o, c) + upper * s, min(o, c) - lower * s, c
+
+    return {
+        "bullish_engulfing": [bar(p, p - s), bar(p - 1.3 * s, p + 0.5 * s)],
+        "bearish_engulfing": [bar(p, p + s), bar(p + 1.3 * s, p - 0.5 * s)],
+        "hammer": [bar(p, p + 0.2 * s, upper=0.05, lower=1.0)],
+        "shooting_star": [bar(p, p - 0.2 * s, upper=1.0, lower=0.05)],
+        "three_white_soldiers": [bar(p, p + s), bar(p + 0.5 * s, p + 2 * s), bar(p + 1.5 * s, p + 3 * s)],
+        "three_black_crows": [bar(p, p - s), bar(p - 0.5 * s, p - 2 * s), bar(p - 1.5 * s, p - 3 * s)],
+    }[name]
+
+
+def plan_bars(rng, n, price, pattern_every=8):
+    """n Bars (open, high, low, close): Random Walk mit Eröffnungslücken plus eingestreuten Mustern."""
+    bars = []
+    close = price
+    while len(bars) < n:
+        if len(bars) % pattern_every == pattern_every - 1:
+            bars.extend(pattern_bars(rng.choice(SEEDED_PATTERNS), close, close * 0.003))
+        else:
+            o = close * np.exp(rng.normal(0, 0.001))
+            c = o * np.exp(rng.normal(0, 0.002))
+            upper, lower = np.abs(rng.normal(0, 0.0012, 2)) * o
+            bars.append((o, max(o, c) + upper, min(o, c) - lower, c))
+        close = bars[-1][3]
+    return np.array(bars[:n])
+
+
+def make_bars(rng, n=600, start="2025-03-03 14:30", price=250.0):
+    ohlc = plan_bars(rng, n, price)
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq="5min", tz="UTC"),
+        "open": ohlc[:, 0].round(2),
+        "high": ohlc[:, 1].round(2),
+        "low": ohlc[:, 2].round(2),
+        "close": ohlc[:, 3].round(2),
+        "volume": rng.integers(5_000, 50_000, n),
+    })
+
+
+def make_trades(rng, start, price, n=5000, mean_gap_ms=1440):
+    """
+    Trades über ~n * mean_gap_ms (Standard: 24 Bars). Je Bar läuft der Preis von open über
+    low/high (bzw. high/low) nach close einer geplanten Bar, sodass die Muster im Stream entstehen.
+    """
+    gaps = rng.exponential(mean_gap_ms, n).astype("int64")
+    offsets = pd.to_timedelta(np.cumsum(gaps), unit="ms")
+    buckets = (offsets // BAR).to_numpy()
+    ohlc = plan_bars(rng, int(buckets.max()) + 1, price)
+
+    prices = np.empty(n)
+    for b in np.unique(buckets):
+        idx = np.flatnonzero(buckets == b)
+        o, h, l, c = ohlc[b]
+        anchors = [o, l, h, c] if c >= o else [o, h, l, c]
+        path = np.interp(np.linspace(0, 3, len(idx)), [0, 1, 2, 3], anchors) if len(idx) > 1 else [c]
+        path = np.clip(path * np.exp(rng.normal(0, 0.0002, len(idx))), l, h)
+        path[0], path[-1] = (o, c) if len(idx) > 1 else (c, c)
+        prices[idx] = path
+    return pd.DataFrame({
+        "timestamp": pd.Timestamp(start) + offsets,
+        "price": prices.round(2),
+        "size": rng.integers(1, 500, n),
+    })
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    bars = make_bars(rng)
+    last = bars.iloc[-1]
+    trades = make_trades(rng, last["timestamp"] + BAR, last["close"])
+
+    FIXTURES.mkdir(exist_ok=True)
+    bars.to_csv(FIXTURES / f"bars_{SYMBOL}_5min.csv", index=False)
+    trades.to_csv(FIXTURES / f"trades_{SYMBOL}.csv.gz", index=False)
+    print(f"{len(bars)} Bars, {len(trades)} Trades → {FIXTURES}")
@@ -0,0 +1,97 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from conftest import SYMBOL, WORKDIR
+
+
+@pytest.fixture
+def trader(bars, fake_client):
+    import trading_bot
+
+    trader = trading_bot.MLTrader(symbol=SYMBOL, ledger=None)
+    trader.seed_bars(bars)
+    return trader
+
+
+def test_detect_candlestick_pattern(benchmark, trader):
+    from candlestick_patterns import detect_candlestick_pattern
+
+    candles = trader.bar_aggregator.window(3)
+    benchmark(detect_candlestick_pattern, candles)
+
+
+def test_get_price_trend_from_data(benchmark, trader):
+    benchmark(trader.get_price_trend_from_data)
+
+
+def test_make_decision(benchmark, trader):
+    benchmark(trader.make_decision, "positive", "up", "hammer")
+
+
+def test_estimate_sentiment(benchmark, headlines):
+    from helper import finbert_utils
+
+    try:
+        finbert_utils.get_backend()
+    except Exception as e:
+        pytest.skip(f"FinBERT nicht ladbar: {type(e).__name__}")
+    benchmark.pedantic(finbert_utils.estimate_sentiment, args=(headlines,), rounds=3, iterations=5)
+
+
+def test_trade_logger_log(benchmark):
+    from trading_logger import TradeLogger
+
+    logger = TradeLogger(WORKDIR / "order_log.csv")
+    actions = ["BUY", "SELL-CLOSE"]
+    counter = iter(range(10 ** 9))
+
+    def log_one():
+        i = next(counter)
+        logger.log(actions[i % 2], SYMBOL, 10, 250.0 + i % 7, "positive", "up", 100_000)
+
+    benchmark(log_one)
+    logger.close()  # inkl. Flush der gepufferten Zeilen
+
+
+def test_on_trade(benchmark, bars, trades, fake_client, monkeypatch):
+    """Alle Fixture-Trades end-to-end durch ingest_trade + on_trade; Cooldown läuft auf der Trade-Zeit."""
+    import live_websocket_bot as lwb
+
+    monkeypatch.setattr(lwb, "LOG_FILE", WORKDIR / "order_log_bot.csv")
+    decisions = Counter()
+    now = [0.0]
+
+    def setup():
+        fake_client.orders.clear()
+        decisions.clear()
+        bot = lwb.LiveWebSocketBot(clock=lambda: now[0])
+        trader = bot.traders[SYMBOL]
+        fake_client.ledger = bot.ledger
+        trader.seed_bars(bars)
+        make_decision = trader.make_decision
+
+        def counted_decision(*args):
+            decision = make_decision(*args)
+            decisions[decision] += 1
+            return decision
+
+        trader.make_decision = counted_decision
+        return (bot,), {}
+
+    def run(bot):
+        async def feed():
+            for trade in trades:
+                now[0] = trade.timestamp.timestamp()
+                fake_client.price = trade.price
+                bot.ingest_trade(trade)
+                await bot.on_trade(trade)
+        asyncio.run(feed())
+        bot.stop()
+
+    benchmark.pedantic(run, setup=setup, rounds=3)
+    benchmark.extra_info.update(ticks=len(trades), decisions=dict(decisions), orders=len(fake_client.orders))
+    if benchmark.stats:  # nicht bei --benchmark-disable
+        benchmark.extra_info["us_per_tick"] = round(benchmark.stats.stats.median / len(trades) * 1e6, 3)
+    assert decisions["buy"] and decisions["sell"] and len(fake_client.orders) > 1
@@ -0,0 +1,39 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncBroker:
+    """
+    Asynchrone Fassade um die MLTrader-Instanzen (ein Pool für alle Symbole).
+    Die blockierenden TradingClient-Aufrufe laufen in einem begrenzten Thread-Pool,
+    damit der Event-Loop des StockDataStream nie auf REST-Antworten wartet.
+    Der TradingClient nutzt intern eine requests.Session (Keep-Alive), die
+    Verbindungen werden also zwischen den Aufrufen wiederverwendet.
+    """
+
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="broker")
+
+    async def run(self, fn, *args):
+        """Führt eine blockierende Funktion im Broker-Pool aus."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def get_position(self, trader):
+        return await self.run(trader.get_position)
+
+    async def get_cash(self, trader):
+        return await self.run(trader.get_cash)
+
+    async def get_state(self, trader):
+        """Holt Position und Cash parallel – ein Round-Trip statt zwei serieller."""
+        if trader.ledger:
+            # lokaler Ledger-Stand: kein Netzwerkzugriff nötig
+            return trader.get_position(), trader.get_cash()
+        return await asyncio.gather(self.get_position(trader), self.get_cash(trader))
+
+    async def submit_order(self, trader, order):
+        return await self.run(trader.submit_order, order)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
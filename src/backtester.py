@@ -0,0 +1,269 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from candlestick_patterns import detect_candlestick_patterns
+from indicators import rolling_mean
+from position_ledger import PositionLedger
+from trading_bot import MLTrader, StrategyParams, ORDER_SIDES
+
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def load_bars(path, symbol=None):
+    """
+    Lädt Bars aus einer Parquet- oder CSV-Datei.
+    Erwartet timestamp (oder date), open, high, low, close, volume und optional symbol/sentiment.
+    """
+    path = Path(path)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    if "timestamp" not in df.columns and "date" in df.columns:
+        df = df.rename(columns={"date": "timestamp"})
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    if symbol is not None and "symbol" in df.columns:
+        df = df[df["symbol"] == symbol]
+    return df.sort_values("timestamp").reset_index(drop=True)
+
+
+def load_from_store(symbols, start, end, timeframe="1Min"):
+    """Lädt Bars aus dem lokalen Bar-Store (fehlende Zeiträume werden einmalig per REST geholt)."""
+    from bar_store import parse_timeframe
+    from helper.config import get_bar_store
+
+    bars = get_bar_store().get_bars(symbols, start, end, parse_timeframe(timeframe))
+    return {symbol: group.sort_values("timestamp").reset_index(drop=True)
+            for symbol, group in bars.groupby("symbol")} if not bars.empty else {}
+
+
+def bar_arrays(bars):
+    """
+    Wandelt einen Bar-DataFrame in ein Dict aus NumPy-Arrays um.
+    Dicts aus Arrays (z. B. Memory-Maps im Parameter-Sweep) werden unverändert durchgereicht.
+    """
+    if not isinstance(bars, pd.DataFrame):
+        return bars
+    ts = bars["timestamp"]
+    if ts.dt.tz is not None:
+        # tz-aware Spalten würden sonst Objekt-Arrays liefern
+        ts = ts.dt.tz_convert(None)
+    arrays = {"timestamp": ts.to_numpy(dtype="datetime64[ns]")}
+    for field in BAR_FIELDS:
+        arrays[field] = bars[field].to_numpy(dtype=np.float64)
+    if "sentiment" in bars.columns:
+        arrays["sentiment"] = bars["sentiment"].to_numpy(dtype=object)
+    return arrays
+
+
+def _first_hit(hit, start, n, chunk=256):
+    """Index des ersten True in hit(lo, hi) ab `start` – blockweise, damit kurze Suchen billig bleiben."""
+    lo = start
+    while lo < n:
+        hi = min(lo + chunk, n)
+        found = np.flatnonzero(hit(lo, hi))
+        if len(found):
+            return lo + int(found[0])
+        lo, chunk = hi, chunk * 4
+    return None
+
+
+class Backtester:
+    """
+    Spielt historische Bars durch dieselbe Entscheidungs-, Cooldown- und Sizing-Logik
+    wie LiveWebSocketBot.on_trade. Signale (Trend, Kerzen, Entscheidung) werden
+    vektorisiert über alle Bars berechnet; nur Bars mit buy/sell-Signal laufen
+    durch die (sequentielle) Order- und Fill-Simulation.
+    """
+
+    def __init__(self, symbol, cash=100_000.0, params=None, slippage_bps=0.0):
+        self.symbol = symbol
+        self.initial_cash = cash
+        self.params = params or StrategyParams()
+        self.slippage = slippage_bps / 10_000
+
+    def signals(self, trader, bars):
+        """Berechnet Trend, Kerzenmuster und Entscheidung für jede Bar in einem Durchlauf."""
+        close = bars["close"]
+        sma = rolling_mean(close, trader.ma_period)
+        trend = np.where(np.isnan(sma), None, np.where(close > sma, "up", "down"))
+        candles = detect_candlestick_patterns((bars["open"], bars["high"], bars["low"], close))
+        decisions = trader.make_decisions(bars.get("sentiment", "neutral"), trend, candles)
+        return trend, candles, decisions
+
+    def _bracket_exit(self, trader, bars, i, side, entry_price):
+        """Sucht ab der Folgebar die erste Bar, in der Stop-Loss oder Take-Profit greift."""
+        stop, take = trader.calculate_risk_levels(entry_price, side=side)
+        high, low = bars["high"], bars["low"]
+        if side == "buy":
+            hit = lambda lo, hi: (low[lo:hi] <= stop) | (high[lo:hi] >= take)
+        else:
+            hit = lambda lo, hi: (high[lo:hi] >= stop) | (low[lo:hi] <= take)
+        j = _first_hit(hit, i + 1, len(high))
+        if j is None:
+            return None
+        # greifen beide in derselben Bar, wird konservativ der Stop angenommen
+        stopped = low[j] <= stop if side == "buy" else high[j] >= stop
+        return j, stop if stopped else take
+
+    def run(self, bars):
+        bars = bar_arrays(bars)
+        account = PositionLedger(client=None)
+        account.cash = self.initial_cash
+        trader = MLTrader(symbol=self.symbol, ledger=account, params=self.params)
+
+        trend, candles, decisions = self.signals(trader, bars)
+        timestamps = bars["timestamp"]
+        close = bars["close"]
+        cooldown = np.timedelta64(int(self.params.order_cooldown * 1e9), "ns")
+        last_order_time = None
+        trades = []
+        entry = {}
+        pending_exit = None  # (Bar, Preis) eines Bracket-Ausstiegs
+
+        def fill(i, action, quantity, price):
+            nonlocal entry
+            side = ORDER_SIDES[action]
+            fill_price = price * (1 + self.slippage) if side == "buy" else price * (1 - self.slippage)
+            account.apply_fill(self.symbol, side, quantity, fill_price)
+
+            # PnL wie im TradeLogger: Eröffnung merken, beim Schließen abrechnen
+            pnl = np.nan
+            if action in ("BUY", "SELL-OPEN"):
+                entry = {"qty": quantity, "invested": quantity * fill_price}
+            else:
+                invested = entry.get("invested", 0.0)
+                pnl = quantity * fill_price - invested if action == "SELL-CLOSE" else invested - quantity * fill_price
+                entry = {}
+
+            trades.append({
+                "bar": i, "timestamp": timestamps[i], "action": action, "quantity": quantity,
+                "price": fill_price, "trend": trend[i], "candle": candles[i], "pnl": pnl,
+                "cash": account.cash,
+            })
+            return side, fill_price
+
+        def flush_exit(before):
+            # Bracket-Ausstieg (broker-seitig) vor der nächsten Entscheidung abwickeln
+            nonlocal pending_exit
+            if pending_exit is not None and pending_exit[0] <= before:
+                j, price = pending_exit
+                position = trader.get_position()
+                if position:
+                    qty = abs(float(position.qty))
+                    fill(j, "SELL-CLOSE" if float(position.qty) > 0 else "BUY-CLOSE", qty, price)
+                pending_exit = None
+
+        for i in np.flatnonzero(decisions != "hold"):
+            flush_exit(i)
+            if last_order_time is not None and timestamps[i] - last_order_time < cooldown:
+                continue
+
+            price = close[i]
+            position = trader.get_position()
+            position_qty = abs(float(position.qty)) if position else 0
+            is_short = position and float(position.qty) < 0
+
+            action, quantity, _ = trader.plan_order(decisions[i], position_qty, is_short, trader.get_cash(), price)
+            if action is None:
+                continue
+
+            side, fill_price = fill(i, action, quantity, price)
+            last_order_time = timestamps[i]
+
+            if action in ("BUY", "SELL-OPEN"):
+                pending_exit = self._bracket_exit(trader, bars, i, side, fill_price) if self.params.use_brackets else None
+            else:
+                pending_exit = None
+
+        flush_exit(len(close))
+
+        trades = pd.DataFrame(trades, columns=["bar", "timestamp", "action", "quantity", "price",
+                                               "trend", "candle", "pnl", "cash"])
+        return BacktestResult(self.symbol, self.initial_cash, bars, trades)
+
+
+class BacktestResult:
+    def __init__(self, symbol, initial_cash, bars, trades):
+        self.symbol = symbol
+        self.initial_cash = initial_cash
+        self.trades = trades
+        self.equity = self._equity_curve(bars, trades)
+
+    def _equity_curve(self, bars, trades):
+        """Equity je Bar = Cash + Position × Schlusskurs (vektorisiert über die Trade-Zeitpunkte)."""
+        n = len(bars["close"])
+        equity = np.full(n, self.initial_cash, dtype=np.float64)
+        if trades.empty:
+            return equity
+
+        signed = np.where(trades["action"].isin(["BUY", "BUY-CLOSE"]), 1.0, -1.0) * trades["quantity"]
+        idx = trades["bar"].to_numpy()
+        position = np.zeros(n)
+        cash = np.full(n, np.nan)
+        np.add.at(position, idx, signed.to_numpy())
+        cash[idx] = trades["cash"].to_numpy()
+        cash = pd.Series(cash).ffill().fillna(self.initial_cash).to_numpy()
+        return cash + np.cumsum(position) * bars["close"]
+
+    def summary(self):
+        closed = self.trades["pnl"].dropna()
+        peak = np.maximum.accumulate(self.equity)
+        drawdown = ((peak - self.equity) / peak).max() if len(self.equity) else 0.0
+        final = self.equity[-1] if len(self.equity) else self.initial_cash
+        return {
+            "symbol": self.symbol,
+            "final_equity": round(final, 2),
+            "return_pct": round((final / self.initial_cash - 1) * 100, 2),
+            "orders": len(self.trades),
+            "round_trips": len(closed),
+            "realized_pnl": round(closed.sum(), 2),
+            "win_rate": round((closed > 0).mean(), 3) if len(closed) else None,
+            "max_drawdown_pct": round(drawdown * 100, 2),
+        }
+
+
+def load_bar_files(paths):
+    """Je Datei ein Symbol (Dateiname) oder eine Datei mit symbol-Spalte → {symbol: DataFrame}."""
+    bars_by_symbol = {}
+    for path in paths:
+        bars = load_bars(path)
+        if "symbol" in bars.columns:
+            for symbol, symbol_bars in bars.groupby("symbol"):
+                bars_by_symbol[symbol] = symbol_bars.reset_index(drop=True)
+        else:
+            bars_by_symbol[Path(path).stem.upper()] = bars
+    return bars_by_symbol
+
+
+def run_backtests(bars_by_symbol, **kwargs):
+    """Backtest mehrerer Symbole, je Symbol ein eigenes (simuliertes) Konto."""
+    return [Backtester(symbol, **kwargs).run(bars) for symbol, bars in bars_by_symbol.items()]
+
+
+def add_data_arguments(parser):
+    parser.add_argument("paths", nargs="*", help="Parquet/CSV-Dateien mit Bars")
+    parser.add_argument("--symbols", help="statt Dateien: Symbole aus dem Bar-Store, z. B. TSLA,AAPL")
+    parser.add_argument("--start", help="Start für --symbols (ISO-Datum)")
+    parser.add_argument("--end", help="Ende für --symbols (ISO-Datum)")
+    parser.add_argument("--timeframe", default="1Min")
+
+
+def load_data_arguments(args):
+    if args.symbols:
+        return load_from_store(args.symbols.split(","), args.start, args.end or pd.Timestamp.utcnow(), args.timeframe)
+    return load_bar_files(args.paths)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline-Backtest von MLTrader auf historischen Bars")
+    add_data_arguments(parser)
+    parser.add_argument("--cash", type=float, default=100_000.0)
+    parser.add_argument("--cooldown", type=float, default=30, help="Order-Cooldown in Sekunden")
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--brackets", action="store_true", help="Stop-Loss/Take-Profit simulieren")
+    args = parser.parse_args()
+
+    params = StrategyParams(order_cooldown=args.cooldown, use_brackets=args.brackets)
+    results = run_backtests(load_data_arguments(args), cash=args.cash, params=params, slippage_bps=args.slippage_bps)
+    print(pd.DataFrame([r.summary() for r in results]).to_string(index=False))
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+
+BAR_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+# Bar-Beginn als Epoch-Sekunden (UTC), Preise/Volumen als float64 – 48 Byte je Bar
+BAR_DTYPE = np.dtype([("timestamp", "i8"), ("open", "f8"), ("high", "f8"), ("low", "f8"),
+                      ("close", "f8"), ("volume", "f8")])
+
+
+class Bar:
+    """Laufende Bar als schlanker Datensatz; `bar["close"]` funktioniert wie beim früheren Dict."""
+    __slots__ = BAR_COLUMNS
+
+    def __init__(self, timestamp, open, high, low, close, volume):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def as_tuple(self):
+        return self.timestamp, self.open, self.high, self.low, self.close, self.volume
+
+
+class BarAggregator:
+    """
+    Baut OHLCV-Bars (Standard: 5 Minuten) fortlaufend aus den WebSocket-Trades.
+    Wird einmalig per REST geseedet und hält die letzten `max_bars` Bars in einem
+    vorallokierten Ringpuffer (strukturiertes NumPy-Array, Speicher je Symbol fest).
+    Jede Bar wird doppelt geschrieben (Slot i und i + Kapazität), dadurch sind die letzten
+    n Bars immer ein zusammenhängender Ausschnitt → window()/closed_bars() liefern Views ohne Kopie.
+    REST wird danach nur noch nach einem Ausfall des Streams benötigt; Intervalle ohne Trades
+    bleiben wie bei Alpacas REST-Bars einfach aus.
+    """
+
+    def __init__(self, symbol, bar_minutes=5, max_bars=240):
+        self.symbol = symbol
+        self.bar_length = timedelta(minutes=bar_minutes)
+        self.bar_seconds = int(self.bar_length.total_seconds())
+        self.max_bars = max_bars
+        self.capacity = max_bars + 1        # + Slot für die laufende Bar
+        self.buffer = np.zeros(2 * self.capacity, dtype=BAR_DTYPE)
+        self.head = 0                       # Slot der nächsten (bzw. laufenden) Bar
+        self.count = 0                      # Anzahl abgeschlossener Bars im Puffer
+        self.current = None                 # laufende (noch offene) Bar
+
+    def bucket_start(self, ts):
+        epoch = int(ts.timestamp())
+        return datetime.fromtimestamp(epoch - epoch % self.bar_seconds, tz=timezone.utc)
+
+    def _write(self, slot, values):
+        self.buffer[slot] = values
+        self.buffer[slot + self.capacity] = values
+
+    def _append(self, bar):
+        self._write(self.head, bar.as_tuple())
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.max_bars)
+
+    def seed(self, df, now=None):
+        """
+        Übernimmt historische Bars (DataFrame mit timestamp/open/high/low/close/volume).
+        Eine noch laufende letzte Bar wird als aktuelle Bar weitergeführt.
+        """
+        now = now or datetime.now(timezone.utc)
+        self.head = 0
+        self.count = 0
+        self.current = None
+        if df is None or df.empty:
+            return
+
+        df = df.iloc[-self.capacity:]
+        timestamps = pd.to_datetime(df["timestamp"], utc=True)
+        bars = np.empty(len(df), dtype=BAR_DTYPE)
+        bars["timestamp"] = timestamps.dt.tz_convert(None).to_numpy(dtype="datetime64[s]").astype("int64")
+        for col in BAR_COLUMNS[1:]:
+            bars[col] = df[col].to_numpy(dtype=np.float64)
+
+        if timestamps.iloc[-1] + self.bar_length > now:
+            self.current = Bar(*bars[-1].tolist())
+            bars = bars[:-1]
+        bars = bars[-self.max_bars:]
+        n = len(bars)
+        self.buffer[:n] = bars
+        self.buffer[self.capacity:self.capacity + n] = bars
+        self.head = n % self.capacity
+        self.count = n
+
+    def on_trade(self, price, size, ts):
+        """
+        Rollt die aktuelle Bar mit einem Trade weiter.
+        Gibt die abgeschlossene Bar zurück, falls mit diesem Trade eine neue Bar beginnt.
+        """
+        epoch = int(ts.timestamp())
+        start = epoch - epoch % self.bar_seconds
+        bar = self.current
+        closed = None
+
+        if bar is not None and start > bar.timestamp:
+            closed = bar
+            self._append(closed)
+            bar = None
+        elif bar is not None and start < bar.timestamp:
+            # verspäteter Trade einer bereits abgeschlossenen Bar – ignorieren
+            return None
+
+        if bar is None:
+            self.current = Bar(start, price, price, price, price, float(size))
+        else:
+            if price > bar.high:
+                bar.high = price
+            elif price < bar.low:
+                bar.low = price
+            bar.close = price
+            bar.volume += size
+
+        return closed
+
+    def closed_bars(self, n=None):
+        """View (ohne Kopie) auf die letzten n abgeschlossenen Bars, älteste zuerst."""
+        n = self.count if n is None else min(n, self.count)
+        end = self.head + self.capacity
+        return self.buffer[end - n:end]
+
+    def window(self, n=None, include_current=True):
+        """
+        Wie closed_bars, aber inkl. laufender Bar (wird dafür in ihren Slot geschrieben).
+        Gültig bis zum nächsten Aufruf/Trade – für längeres Aufheben .copy() verwenden.
+        """
+        if not include_current or self.current is None:
+            return self.closed_bars(n)
+        n = self.count + 1 if n is None else min(n, self.count + 1)
+        self._write(self.head, self.current.as_tuple())
+        end = self.head + self.capacity + 1
+        return self.buffer[end - n:end]
+
+    def to_pandas(self, n=None, include_current=True):
+        """DataFrame-Kopie der letzten n Bars (für Research/Backtests, nicht für den Tick-Pfad)."""
+        bars = self.window(n, include_current)
+        df = pd.DataFrame({col: bars[col] for col in BAR_COLUMNS[1:]})
+        df.insert(0, "timestamp", pd.to_datetime(bars["timestamp"], unit="s", utc=True))
+        return df
+
+    to_dataframe = to_pandas
@@ -0,0 +1,218 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from alpaca.data.requests import StockBarsRequest
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+
+from helper.log_utils import get_logger
+
+BAR_STORE_DIR = Path(os.getenv("BAR_STORE_DIR", "data/bars"))
+
+log = get_logger("bar_store")
+
+UNIT_SECONDS = {
+    TimeFrameUnit.Minute: 60,
+    TimeFrameUnit.Hour: 3600,
+    TimeFrameUnit.Day: 86400,
+    TimeFrameUnit.Week: 7 * 86400,
+    TimeFrameUnit.Month: 31 * 86400,
+}
+
+
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def parse_timeframe(text):
+    """'5Min', '1Hour', '1Day' … → TimeFrame"""
+    for unit in UNIT_SECONDS:
+        if text.endswith(unit.value):
+            return TimeFrame(int(text[:-len(unit.value)] or 1), unit)
+    raise ValueError(f"Unbekannter Timeframe: {text}")
+
+
+def normalize_bars(bars):
+    """Bringt die Antwort von get_stock_bars(...).df in flache Spalten (symbol, timestamp, OHLCV, ...)."""
+    if isinstance(bars.index, pd.MultiIndex):
+        bars = bars.reset_index()
+    if isinstance(bars.columns, pd.MultiIndex):
+        bars.columns = bars.columns.get_level_values(-1)
+    if "timestamp" in bars.columns:
+        bars["timestamp"] = pd.to_datetime(bars["timestamp"], utc=True)
+    return bars
+
+
+def _replace_atomic(path, write):
+    """Schreibt über eine eindeutige Temp-Datei im Zielordner und ersetzt dann atomar."""
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+        tmp = f.name
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class BarStore:
+    """
+    Lokaler Bar-Cache: pro Symbol und Timeframe ein Ordner mit einer Parquet-Datei je
+    Zeitabschnitt (Tag bei Intraday-Bars, Jahr bei Tages-/Wochen-/Monatsbars). Ein Sync
+    schreibt nur die Abschnitte neu, die er berührt – die Kosten wachsen nicht mit der Historie.
+    Pro Anfrage wird nur der fehlende Zeitraum per REST nachgeladen (alle betroffenen
+    Symbole in einer Anfrage); gelesen werden nur die Abschnitte im angefragten Zeitraum.
+    Die abgedeckten Zeiträume stehen in `_coverage.json`, damit Zeiträume ohne
+    Handel (Wochenende, Feiertage) nicht bei jeder Anfrage erneut geladen werden.
+    Thread-sicher (der AsyncBroker ruft aus mehreren Threads): ein Lock pro Symbol/Timeframe,
+    ein Lock für die Coverage.
+    """
+
+    def __init__(self, data_client, root=BAR_STORE_DIR, feed="iex"):
+        self.data_client = data_client
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.feed = feed
+        self.coverage_file = self.root / "_coverage.json"
+        self.coverage = json.loads(self.coverage_file.read_text()) if self.coverage_file.exists() else {}
+        self._lock = threading.Lock()  # coverage + _locks
+        self._locks = {}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def path(self, symbol, timeframe):
+        """Ordner mit den Abschnittsdateien eines Symbols/Timeframes."""
+        return self.root / f"{symbol}_{timeframe.value}"
+
+    @staticmethod
+    def _partition_format(timeframe):
+        return "%Y" if timeframe.unit_value in (TimeFrameUnit.Day, TimeFrameUnit.Week, TimeFrameUnit.Month) \
+            else "%Y-%m-%d"
+
+    def _migrate(self, symbol, timeframe):
+        """Alte Einzeldatei (<symbol>_<tf>.parquet) einmalig in Abschnitte aufteilen."""
+        legacy = self.root / f"{symbol}_{timeframe.value}.parquet"
+        if legacy.exists():
+            self._append(symbol, timeframe, pq.read_table(legacy).to_pandas())
+            legacy.unlink()
+
+    def read(self, symbol, timeframe, start=None, end=None):
+        folder = self.path(symbol, timeframe)
+        if not folder.is_dir():
+            return pd.DataFrame()
+        fmt = self._partition_format(timeframe)
+        first = _utc(start).strftime(fmt) if start is not None else ""
+        last = _utc(end).strftime(fmt) if end is not None else "~"
+        # Dateinamen sind sortierbar (ISO-Datum) → nur Abschnitte im Zeitraum lesen
+        files = sorted(p for p in folder.glob("*.parquet") if first <= p.stem <= last)
+        if not files:
+            return pd.DataFrame()
+        filters = []
+        if start is not None:
+            filters.append(("timestamp", ">=", _utc(start)))
+        if end is not None:
+            filters.append(("timestamp", "<=", _utc(end)))
+        tables = [pq.read_table(p, memory_map=True, filters=filters or None) for p in files]
+        return pa.concat_tables(tables).to_pandas() if len(tables) > 1 else tables[0].to_pandas()
+
+    def _append(self, symbol, timeframe, bars):
+        """Führt neue Bars mit den betroffenen Abschnittsdateien zusammen (neuere gewinnen)."""
+        if bars.empty:
+            return
+        folder = self.path(symbol, timeframe)
+        folder.mkdir(parents=True, exist_ok=True)
+        partitions = pd.to_datetime(bars["timestamp"], utc=True).dt.strftime(self._partition_format(timeframe))
+        for name, new in bars.groupby(partitions.to_numpy()):
+            path = folder / f"{name}.parquet"
+            if path.exists():
+                new = pd.concat([pq.read_table(path).to_pandas(), new], ignore_index=True)
+            new = new.drop_duplicates("timestamp", keep="last").sort_values("timestamp").reset_index(drop=True)
+            table = pa.Table.from_pandas(new, preserve_index=False)
+            _replace_atomic(path, lambda tmp: pq.write_table(table, tmp))
+
+    def _save_coverage(self):
+        text = json.dumps(self.coverage, indent=2)
+        _replace_atomic(self.coverage_file, lambda tmp: Path(tmp).write_text(text))
+
+    def _missing_range(self, key, start, end):
+        """Fehlender Zeitraum, so dass die Abdeckung ein zusammenhängendes Intervall bleibt."""
+        with self._lock:
+            covered = self.coverage.get(key)
+        if covered is None:
+            return start, end
+        covered_start, covered_end = _utc(covered[0]), _utc(covered[1])
+        if start >= covered_start and end <= covered_end:
+            return None
+        if start >= covered_start:
+            return covered_end, end
+        if end <= covered_end:
+            return start, covered_start
+        return start, end
+
+    def get_bars(self, symbols, start, end, timeframe):
+        """
+        Liefert Bars für ein oder mehrere Symbole im Zeitraum [start, end] (Spalte `symbol`).
+        Fehlende Bereiche werden gesammelt in einer einzigen REST-Anfrage nachgeladen.
+        """
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        bar_length = timedelta(seconds=timeframe.amount_value * UNIT_SECONDS[timeframe.unit_value])
+        now = pd.Timestamp(datetime.now(timezone.utc))
+        start, end = _utc(start), min(_utc(end), now)
+
+        with ExitStack() as stack:
+            # feste Reihenfolge → keine Verklemmung zwischen Anfragen mit überlappenden Symbolen
+            for symbol in sorted(set(symbols)):
+                stack.enter_context(self._key_lock(f"{symbol}_{timeframe.value}"))
+            return self._get_bars_locked(symbols, start, end, timeframe, bar_length, now)
+
+    def _get_bars_locked(self, symbols, start, end, timeframe, bar_length, now):
+        missing = {}
+        for symbol in symbols:
+            self._migrate(symbol, timeframe)
+            gap = self._missing_range(f"{symbol}_{timeframe.value}", start, end)
+            if gap is not None:
+                missing[symbol] = gap
+
+        if missing:
+            fetch_start = min(gap[0] for gap in missing.values())
+            fetch_end = max(gap[1] for gap in missing.values())
+            request_params = StockBarsRequest(
+                symbol_or_symbols=list(missing),
+                timeframe=timeframe,
+                start=fetch_start.to_pydatetime(),
+                end=fetch_end.to_pydatetime(),
+                feed=self.feed,
+            )
+            fetched = normalize_bars(self.data_client.get_stock_bars(request_params).df)
+            log.info("[STORE] %d Bars für %d Symbol(e) nachgeladen (%s – %s)", len(fetched), len(missing),
+                     f"{fetch_start:%Y-%m-%d %H:%M}", f"{fetch_end:%Y-%m-%d %H:%M}")
+
+            for symbol in missing:
+                key = f"{symbol}_{timeframe.value}"
+                new = fetched[fetched["symbol"] == symbol] if "symbol" in fetched.columns else fetched
+                self._append(symbol, timeframe, new)
+
+                # die jüngste Bar kann noch laufen → nicht als abgedeckt markieren
+                new_start, new_end = fetch_start, min(fetch_end, now - bar_length)
+                with self._lock:
+                    covered = self.coverage.get(key)
+                    if covered:
+                        new_start = min(new_start, _utc(covered[0]))
+                        new_end = max(new_end, _utc(covered[1]))
+                    self.coverage[key] = [new_start.isoformat(), max(new_start, new_end).isoformat()]
+            with self._lock:
+                self._save_coverage()
+
+        frames = [self.read(symbol, timeframe, start, end) for symbol in symbols]
+        frames = [f for f in frames if not f.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
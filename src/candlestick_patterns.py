@@ -1,43 +1,134 @@
+import numpy as np
 import pandas as pd
 
-def detect_candlestick_pattern(df: pd.DataFrame):
+
+# Muster in Prioritätsreihenfolge (bei mehreren Treffern gewinnt das erste)
+PATTERNS = [
+    "bullish_engulfing",
+    "bearish_engulfing",
+    "hammer",
+    "shooting_star",
+    "morning_star",
+    "three_white_soldiers",
+    "three_black_crows",
+]
+# Bit je Muster für die Bitmaske, z. B. PATTERN_BITS["hammer"] == 4
+PATTERN_BITS = {name: 1 << i for i, name in enumerate(PATTERNS)}
+
+
+def _ohlc_arrays(data):
+    """
+    Akzeptiert einen DataFrame oder ein strukturiertes Array (open, high, low, close, z. B. die
+    Ringpuffer-View aus BarAggregator.window) oder ein Tupel aus 4 Arrays.
+    """
+    if isinstance(data, pd.DataFrame):
+        return tuple(data[col].to_numpy(dtype=np.float64) for col in ("open", "high", "low", "close"))
+    if isinstance(data, np.ndarray) and data.dtype.names:
+        return tuple(data[col] for col in ("open", "high", "low", "close"))
+    return tuple(np.asarray(a, dtype=np.float64) for a in data)
+
+
+def _shift(a, n):
+    out = np.full_like(a, np.nan)
+    if n < len(a):
+        out[n:] = a[:-n]
+    return out
+
+
+def _pattern_conditions(o3, h3, l3, c3):
+    """
+    Bedingungen aller Muster für jede Kerze als Boolean-Arrays.
+    c3 ist die aktuelle Kerze, c2/c1 die vorherige bzw. vorvorherige (verschobene Arrays).
+    """
+    o2, c2 = _shift(o3, 1), _shift(c3, 1)
+    o1, c1 = _shift(o3, 2), _shift(c3, 2)
+
+    body = np.abs(c3 - o3)
+    lower_shadow = np.minimum(o3, c3) - l3
+    upper_shadow = h3 - np.maximum(o3, c3)
+
+    bull1, bull2, bull3 = c1 > o1, c2 > o2, c3 > o3
+    bear1, bear2, bear3 = c1 < o1, c2 < o2, c3 < o3
+
+    conditions = [
+        bear2 & bull3 & (c3 > o2) & (o3 < c2),
+        bull2 & bear3 & (o3 > c2) & (c3 < o2),
+        (lower_shadow > 2 * body) & (upper_shadow < body),
+        (upper_shadow > 2 * body) & (lower_shadow < body),
+        bear1 & (np.abs(c2 - o2) < (o1 - c1) * 0.5) & bull3 & (c3 > (o1 + c1) / 2),
+        # drei steigende Kerzen, jede eröffnet im Körper der vorherigen und schließt höher
+        bull1 & bull2 & bull3 & (c2 > c1) & (c3 > c2)
+        & (o2 > o1) & (o2 < c1) & (o3 > o2) & (o3 < c2),
+        # drei fallende Kerzen, jede eröffnet im Körper der vorherigen und schließt tiefer
+        bear1 & bear2 & bear3 & (c2 < c1) & (c3 < c2)
+        & (o2 < o1) & (o2 > c1) & (o3 < o2) & (o3 > c2),
+    ]
+
+    # wie im Einzelaufruf: erst ab der dritten Kerze wird ausgewertet
+    valid = np.arange(len(c3)) >= 2
+    return [cond & valid for cond in conditions]
+
+
+def candlestick_bitmask(data):
+    """
+    Vektorisierte Mustererkennung über alle Kerzen in einem Durchlauf.
+    Gibt je Kerze eine Bitmaske aller zutreffenden Muster zurück (siehe PATTERN_BITS).
+    """
+    arrays = _ohlc_arrays(data)
+    mask = np.zeros(len(arrays[3]), dtype=np.uint8)
+    for name, cond in zip(PATTERNS, _pattern_conditions(*arrays)):
+        mask |= np.where(cond, PATTERN_BITS[name], 0).astype(np.uint8)
+    return mask
+
+
+def detect_candlestick_patterns(data):
+    """
+    Vektorisierte Mustererkennung über einen ganzen DataFrame bzw. OHLC-Arrays.
+    Gibt je Kerze das Muster mit der höchsten Priorität zurück oder 'neutral'.
+    """
+    conditions = _pattern_conditions(*_ohlc_arrays(data))
+    return np.select(conditions, PATTERNS, default="neutral").astype(object)
+
+
+def _last_three(df):
+    """open/high/low/close der letzten 3 Kerzen als Python-Floats (DataFrame oder strukturiertes Array)."""
+    if isinstance(df, pd.DataFrame):
+        return df[["open", "high", "low", "close"]].iloc[-3:].to_numpy(dtype=np.float64).tolist()
+    names = df.dtype.names
+    columns = [names.index(col) for col in ("open", "high", "low", "close")]
+    return [[row[i] for i in columns] for row in df[-3:].tolist()]
+
+
+def detect_candlestick_pattern(df):
     """
     Erkennt grundlegende Candlestick-Muster anhand der letzten 3 Kerzen.
-    Erwartet einen DataFrame mit mind. 3 Kerzen (open, high, low, close).
+    Erwartet einen DataFrame oder ein strukturiertes Bar-Array mit mind. 3 Kerzen (open, high, low, close).
     Gibt das erkannte Muster zurück oder 'neutral'.
+    Skalarer Pfad für den Tick-Pfad: dieselben Bedingungen wie _pattern_conditions, aber nur für die
+    letzte Kerze und in Prioritätsreihenfolge mit frühem Abbruch statt verschobener Arrays.
     """
     if len(df) < 3:
         return "neutral"
 
-    c1, c2, c3 = df.iloc[-3], df.iloc[-2], df.iloc[-1]
-
-    # Bullish Engulfing
-    if c2['close'] < c2['open'] and c3['close'] > c3['open']:
-        if c3['close'] > c2['open'] and c3['open'] < c2['close']:
-            return "bullish_engulfing"
-
-    # Bearish Engulfing
-    if c2['close'] > c2['open'] and c3['close'] < c3['open']:
-        if c3['open'] > c2['close'] and c3['close'] < c2['open']:
-            return "bearish_engulfing"
-
-    # Hammer
-    body = abs(c3['close'] - c3['open'])
-    lower_shadow = min(c3['open'], c3['close']) - c3['low']
-    upper_shadow = c3['high'] - max(c3['open'], c3['close'])
+    (o1, _, _, c1), (o2, _, _, c2), (o3, h3, l3, c3) = _last_three(df)
+    body = abs(c3 - o3)
+    lower_shadow = min(o3, c3) - l3
+    upper_shadow = h3 - max(o3, c3)
+    bull1, bull2, bull3 = c1 > o1, c2 > o2, c3 > o3
+    bear1, bear2, bear3 = c1 < o1, c2 < o2, c3 < o3
 
+    if bear2 and bull3 and c3 > o2 and o3 < c2:
+        return "bullish_engulfing"
+    if bull2 and bear3 and o3 > c2 and c3 < o2:
+        return "bearish_engulfing"
     if lower_shadow > 2 * body and upper_shadow < body:
         return "hammer"
-
-    # Shooting Star
     if upper_shadow > 2 * body and lower_shadow < body:
         return "shooting_star"
-
-    # Morning Star (bullish reversal)
-    if (c1['close'] < c1['open'] and
-        abs(c2['close'] - c2['open']) < (c1['open'] - c1['close']) * 0.5 and
-        c3['close'] > c3['open'] and
-        c3['close'] > (c1['open'] + c1['close']) / 2):
+    if bear1 and abs(c2 - o2) < (o1 - c1) * 0.5 and bull3 and c3 > (o1 + c1) / 2:
         return "morning_star"
-
+    if bull1 and bull2 and bull3 and c2 > c1 and c3 > c2 and o1 < o2 < c1 and o2 < o3 < c2:
+        return "three_white_soldiers"
+    if bear1 and bear2 and bear3 and c2 < c1 and c3 < c2 and c1 < o2 < o1 and c2 < o3 < o2:
+        return "three_black_crows"
     return "neutral"
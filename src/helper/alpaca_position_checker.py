@@ -1,22 +1,13 @@
-import os
-from dotenv import load_dotenv
-from alpaca.trading.client import TradingClient
 from alpaca.trading.models import Position
 
+from helper.config import get_trading_client
 
-load_dotenv()
-# Optional: Direkt eintragen zum Debuggen
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
-
-# Alpaca im Paper-Modus
-client = TradingClient(API_KEY, API_SECRET, paper=True)
 
 def check_all_positions():
     print("[TEST] Prüfe offene Positionen im Paper-Konto...")
 
     try:
-        positions = client.get_all_positions()
+        positions = get_trading_client().get_all_positions()
         if positions:
             print(f"[INFO] Es wurden {len(positions)} Position(en) gefunden:")
             for p in positions:
@@ -29,13 +20,15 @@ def check_all_positions():
 def check_single_position(symbol="TSLA"):
     print(f"\n[TEST] Prüfe Position für Symbol: {symbol}")
     try:
-        position: Position = client.get_open_position(symbol)
+        position: Position = get_trading_client().get_open_position(symbol)
         print(f"[INFO] {symbol}: {position.qty} Stück @ {position.avg_entry_price} ({position.side})")
     except Exception as e:
         print(f"[FEHLER] Keine offene Position für {symbol} gefunden oder Fehler: {e}")
 
 
 if __name__ == "__main__":
+    # Alpaca im Paper-Modus (ALPACA_PAPER=0 → Live-Konto)
+    client = get_trading_client()
     try:
         account = client.get_account()
         print(f"[OK] Erfolgreich verbunden mit Konto: {account.account_number}")
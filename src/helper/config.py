@@ -0,0 +1,74 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+
+# .env genau einmal laden – alle Module lesen Keys und Clients nur noch hier
+load_dotenv()
+
+API_KEY = os.getenv("API_KEY")
+API_SECRET = os.getenv("API_SECRET")
+NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+PAPER = os.getenv("ALPACA_PAPER", "1") == "1"
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _get(name, factory):
+    """Erzeugt den Client beim ersten Zugriff (thread-sicher) und gibt danach dieselbe Instanz zurück."""
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def override(name, client):
+    """Ersetzt einen Client (Replay, Aufzeichnung, Benchmarks mit Fake-Clients)."""
+    with _lock:
+        _clients[name] = client
+    return client
+
+
+def reset(name):
+    """Verwirft einen Client; der nächste get_…-Aufruf baut ihn neu (z. B. Stream nach Reconnect)."""
+    with _lock:
+        return _clients.pop(name, None)
+
+
+def get_trading_client():
+    def build():
+        from alpaca.trading.client import TradingClient
+        return TradingClient(API_KEY, API_SECRET, paper=PAPER)
+    return _get("trading", build)
+
+
+def get_data_client():
+    def build():
+        from alpaca.data.historical import StockHistoricalDataClient
+        return StockHistoricalDataClient(API_KEY, API_SECRET)
+    return _get("data", build)
+
+
+def get_bar_store():
+    def build():
+        from bar_store import BarStore
+        return BarStore(get_data_client())
+    return _get("bar_store", build)
+
+
+def get_stream():
+    def build():
+        from alpaca.data.live import StockDataStream
+        return StockDataStream(API_KEY, API_SECRET)
+    return _get("stream", build)
+
+
+def get_trading_stream():
+    def build():
+        from alpaca.trading.stream import TradingStream
+        return TradingStream(API_KEY, API_SECRET, paper=PAPER)
+    return _get("trading_stream", build)
@@ -1,12 +1,176 @@
 # finbert_utils.py
 
-from transformers import BertTokenizer, BertForSequenceClassification
-import torch
-import torch.nn.functional as F
+import os
+import threading
+
+import numpy as np
+
+from helper.log_utils import get_logger
+
+# Modell & Tokenizer werden erst beim ersten Scoring geladen (siehe get_backend),
+# damit ein Import von finbert_utils weder Sekunden noch ~500 MB RAM kostet.
+MODEL_NAME = os.getenv("FINBERT_MODEL", "ProsusAI/finbert")
+FINBERT_BACKEND = os.getenv("FINBERT_BACKEND", "torch")  # torch | torch-int8 | onnx
+FINBERT_THREADS = int(os.getenv("FINBERT_THREADS", "0")) or None
+FINBERT_BATCH_SIZE = int(os.getenv("FINBERT_BATCH_SIZE", "16"))
+FINBERT_ONNX_PATH = os.getenv("FINBERT_ONNX_PATH", "finbert.onnx")
+
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+log = get_logger("finbert")
+
+
+def _softmax(logits):
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class SentimentBackend:
+    """
+    Basisklasse der FinBERT-Backends. Texte werden nach Token-Länge sortiert und in
+    Batches ähnlicher Länge ausgewertet (Length-Bucketing), damit kurze Headlines
+    nicht auf die Länge der längsten Headline gepaddet werden.
+    """
+    name = "base"
+
+    def __init__(self, threads=FINBERT_THREADS, batch_size=FINBERT_BATCH_SIZE):
+        from transformers import BertTokenizer
+
+        self.threads = threads
+        self.batch_size = batch_size
+        self.tokenizer = BertTokenizer.from_pretrained(MODEL_NAME)
+
+    def logits(self, batch):
+        """batch: Dict aus NumPy-Arrays (input_ids, attention_mask, token_type_ids)."""
+        raise NotImplementedError
+
+    def score(self, texts):
+        if not texts:
+            return []
+        encoded = self.tokenizer(list(texts), truncation=True)
+        order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+        results = [None] * len(texts)
+
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start:start + self.batch_size]
+            features = [{key: encoded[key][i] for key in encoded.keys()} for i in chunk]
+            batch = self.tokenizer.pad(features, return_tensors="np")
+            probs = _softmax(self.logits(dict(batch)))
+            for i, p in zip(chunk, probs):
+                results[i] = p.tolist()
+        return results
+
+
+class TorchBackend(SentimentBackend):
+    name = "torch"
+    quantize = False
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        import torch
+        from transformers import BertForSequenceClassification
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        self.torch = torch
+        model = BertForSequenceClassification.from_pretrained(MODEL_NAME).eval()
+        if self.quantize:
+            # dynamische int8-Quantisierung der Linear-Layer (CPU)
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def logits(self, batch):
+        inputs = {key: self.torch.from_numpy(value) for key, value in batch.items()}
+        with self.torch.inference_mode():
+            return self.model(**inputs).logits.numpy()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    name = "torch-int8"
+    quantize = True
+
+
+class OnnxBackend(SentimentBackend):
+    """ONNX-Runtime auf der CPU; das Modell wird beim ersten Start einmalig exportiert."""
+    name = "onnx"
+
+    def __init__(self, onnx_path=FINBERT_ONNX_PATH, **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("FINBERT_BACKEND=onnx benötigt das Paket onnxruntime") from e
+
+        if not os.path.exists(onnx_path):
+            self.export(onnx_path)
+
+        options = ort.SessionOptions()
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def export(self, onnx_path):
+        import torch
+        from transformers import BertForSequenceClassification
+
+        log.info("[FinBERT] Exportiere %s nach %s …", MODEL_NAME, onnx_path)
+        model = BertForSequenceClassification.from_pretrained(MODEL_NAME).eval()
+        model.config.return_dict = False
+        dummy = self.tokenizer(["export"], return_tensors="pt")
+        names = ["input_ids", "attention_mask", "token_type_ids"]
+        axes = {name: {0: "batch", 1: "sequence"} for name in names}
+        axes["logits"] = {0: "batch"}
+        torch.onnx.export(
+            model, tuple(dummy[name] for name in names), onnx_path,
+            input_names=names, output_names=["logits"], dynamic_axes=axes, opset_version=17,
+            dynamo=False,
+        )
+
+    def logits(self, batch):
+        inputs = {key: value.astype(np.int64) for key, value in batch.items() if key in self.input_names}
+        return self.session.run(["logits"], inputs)[0]
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    """Lädt das konfigurierte Backend beim ersten Aufruf (thread-sicher) und gibt es zurück."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = BACKENDS[name or FINBERT_BACKEND]()
+                log.info("[FinBERT] Backend '%s' geladen.", _backend.name)
+    return _backend
+
+
+def score_headlines(texts):
+    """
+    Gibt für jeden Text die Wahrscheinlichkeiten [positiv, negativ, neutral] als Liste zurück.
+    """
+    return get_backend().score(texts)
+
+
+def aggregate_sentiment(probs):
+    """
+    Mittelt Einzel-Wahrscheinlichkeiten (z. B. aus dem Headline-Cache) und gibt
+    (Wahrscheinlichkeit, dominantes Sentiment) zurück.
+    """
+    n = len(probs)
+    avg_probs = [sum(p[i] for p in probs) / n for i in range(len(SENTIMENTS))]
+    best = max(range(len(SENTIMENTS)), key=avg_probs.__getitem__)
+    return avg_probs[best], SENTIMENTS[best]
 
-# Modell & Tokenizer laden (einmalig)
-tokenizer = BertTokenizer.from_pretrained("ProsusAI/finbert")
-model = BertForSequenceClassification.from_pretrained("ProsusAI/finbert")
 
 def estimate_sentiment(texts):
     """
@@ -14,15 +178,4 @@ def estimate_sentiment(texts):
     - die durchschnittliche Wahrscheinlichkeit für positives Sentiment zurück,
     - das dominante Sentiment: "positive", "neutral" oder "negative"
     """
-    inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-
-    probs = F.softmax(outputs.logits, dim=-1)
-    avg_probs = probs.mean(dim=0)
-
-    sentiments = ["positive", "negative", "neutral"]
-    sentiment = sentiments[avg_probs.argmax().item()]
-    probability = avg_probs.max()
-
-    return probability, sentiment
+    return aggregate_sentiment(score_headlines(texts))
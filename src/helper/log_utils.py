@@ -0,0 +1,91 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+
+ROOT_LOGGER = "mi_trade"
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Eintrag; Felder aus extra={"fields": {...}} landen auf oberster Ebene."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        return f"{text} {json.dumps(fields, ensure_ascii=False, default=str)}" if fields else text
+
+
+class RawQueueHandler(logging.handlers.QueueHandler):
+    """
+    Stellt den Record in die Queue, ohne ihn zu formatieren: Formatter (JSON/Text, Traceback) laufen
+    erst im Listener. Nur die %-Argumente werden vorher in die Nachricht eingesetzt – veränderliche
+    Argumente (Dicts, Positionen, DataFrames) würden sonst mit ihrem späteren Stand geloggt.
+    """
+
+    def prepare(self, record):
+        if not record.args:
+            return record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    """
+    Hängt einen QueueHandler an den Root-Logger des Bots; formatiert und geschrieben wird
+    im Thread des QueueListeners, nicht im Event-Loop.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    root.addHandler(RawQueueHandler(log_queue))
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def log_event(logger, level, msg, **fields):
+    """Loggt `msg` mit strukturierten Feldern; nichts wird aufbereitet, wenn das Level aus ist."""
+    if logger.isEnabledFor(level):
+        logger.log(level, msg, extra={"fields": fields})
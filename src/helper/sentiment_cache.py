@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+
+from helper.log_utils import get_logger
+
+log = get_logger("sentiment_cache")
+
+
+class SentimentCache:
+    """
+    LRU-Cache der FinBERT-Wahrscheinlichkeiten je Headline.
+    Schlüssel ist ein Hash der normalisierten Headline; optional wird der Cache als
+    JSON-Datei gespeichert, damit ein Neustart nicht alle Headlines neu bewerten muss.
+    """
+
+    def __init__(self, maxsize=5000, path=None):
+        self.maxsize = maxsize
+        self.path = Path(path) if path else None
+        self.entries = OrderedDict()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.path and self.path.exists():
+            self.load()
+
+    @staticmethod
+    def key(title):
+        normalized = re.sub(r"\s+", " ", title).strip().lower()
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, title):
+        key = self.key(title)
+        probs = self.entries.get(key)
+        if probs is not None:
+            self.entries.move_to_end(key)
+        return probs
+
+    def put(self, title, probs):
+        key = self.key(title)
+        self.entries[key] = list(probs)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def score(self, titles, scorer):
+        """
+        Gibt die Wahrscheinlichkeiten für alle Titel zurück. Nur bisher unbekannte
+        Titel werden (in einem Aufruf) durch `scorer` bewertet.
+        """
+        cached = {title: self.get(title) for title in titles}
+        unseen = [title for title, probs in cached.items() if probs is None]
+        self.hits += len(titles) - len(unseen)
+        self.misses += len(unseen)
+
+        if unseen:
+            for title, probs in zip(unseen, scorer(unseen)):
+                self.put(title, probs)
+                cached[title] = list(probs)
+
+        return [cached[title] for title in titles]
+
+    def load(self):
+        try:
+            self.entries = OrderedDict(json.loads(self.path.read_text()))
+        except (OSError, ValueError) as e:
+            log.warning("Sentiment-Cache konnte nicht geladen werden: %s", e)
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries))
+        os.replace(tmp, self.path)
+        self.dirty = False
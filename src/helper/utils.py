@@ -1,27 +1,14 @@
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from dotenv import load_dotenv
-import os
 import pandas as pd
 import pytz
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
+from helper.config import get_bar_store
 
-data_client = StockHistoricalDataClient(API_KEY, API_SECRET)
 
 def load_alpaca_data(symbol, start_date, end_date):
-    request_params = StockBarsRequest(
-        symbol_or_symbols=symbol,
-        timeframe=TimeFrame.Day,
-        start=start_date,
-        end=end_date,
-    )
-    bars = data_client.get_stock_bars(request_params).df
+    # Tagesbars kommen aus dem lokalen Bar-Store; REST nur für fehlende Zeiträume
+    bars = get_bar_store().get_bars(symbol, start_date, end_date, TimeFrame.Day)
     if not bars.empty:
-        bars = bars.reset_index()
         bars = bars[bars['symbol'] == symbol]
         return pd.DataFrame({
             'date': bars['timestamp'],
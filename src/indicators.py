@@ -0,0 +1,323 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytz
+
+MARKET_TZ = pytz.timezone("America/New_York")
+# Sitzungsbeginn (regulärer Handel) in New Yorker Ortszeit – ab hier startet der VWAP neu
+SESSION_OPEN = timedelta(hours=9, minutes=30)
+
+
+class RollingWindow:
+    """Vorallokierter Ringpuffer fester Länge für die letzten `period` Werte."""
+
+    def __init__(self, period):
+        self.period = period
+        self.values = np.zeros(period, dtype=np.float64)
+        self.count = 0
+        self.pos = 0
+
+    def push(self, value):
+        """Schreibt einen Wert und gibt den herausgefallenen Wert zurück (oder None)."""
+        old = self.values[self.pos] if self.count >= self.period else None
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.period
+        self.count = min(self.count + 1, self.period)
+        return old
+
+    @property
+    def full(self):
+        return self.count >= self.period
+
+
+class SMA:
+    """Gleitender Durchschnitt mit laufender Summe – O(1) pro Update."""
+
+    def __init__(self, period=20):
+        self.period = period
+        self.window = RollingWindow(period)
+        self.total = 0.0
+        self.value = None
+
+    def update(self, x):
+        old = self.window.push(x)
+        self.total += x - (old if old is not None else 0.0)
+        self.value = self.total / self.period if self.window.full else None
+        return self.value
+
+    def seed(self, values):
+        """Initialisiert aus einem historischen Array und gibt die SMA-Reihe vektorisiert zurück."""
+        values = np.asarray(values, dtype=np.float64)
+        for x in values[-self.period:]:
+            self.window.push(x)
+        tail = values[-self.period:]
+        self.total = float(tail.sum())
+        self.value = self.total / self.period if self.window.full else None
+        return rolling_mean(values, self.period)
+
+
+class EMA:
+    """Exponentieller Durchschnitt, Start mit dem SMA der ersten `period` Werte."""
+
+    def __init__(self, period=20):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.warmup = SMA(period)
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = self.warmup.update(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def seed(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(len(values), np.nan)
+        if len(values) < self.period:
+            for x in values:
+                self.update(x)
+            return out
+        out[self.period - 1] = values[:self.period].mean()
+        for i in range(self.period, len(values)):
+            out[i] = out[i - 1] + self.alpha * (values[i] - out[i - 1])
+        self.value = float(out[-1])
+        return out
+
+
+class RollingStd:
+    """Gleitende Standardabweichung über laufende Summe und Quadratsumme."""
+
+    def __init__(self, period=20):
+        self.period = period
+        self.window = RollingWindow(period)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.mean = None
+        self.value = None
+
+    def update(self, x):
+        old = self.window.push(x)
+        if old is not None:
+            self.total -= old
+            self.total_sq -= old * old
+        self.total += x
+        self.total_sq += x * x
+        if not self.window.full:
+            return None
+        self.mean = self.total / self.period
+        variance = max(self.total_sq / self.period - self.mean * self.mean, 0.0)
+        self.value = math.sqrt(variance)
+        return self.value
+
+    def seed(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        for x in values[-self.period:]:
+            self.update(x)
+        return rolling_std(values, self.period)
+
+
+class BollingerBands:
+    def __init__(self, period=20, width=2.0):
+        self.width = width
+        self.std = RollingStd(period)
+        self.value = None  # (lower, mid, upper)
+
+    def update(self, x):
+        if self.std.update(x) is None:
+            return None
+        mid = self.std.mean
+        band = self.width * self.std.value
+        self.value = (mid - band, mid, mid + band)
+        return self.value
+
+    def seed(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        std = self.std.seed(values)
+        if self.std.value is not None:
+            mid = self.std.mean
+            self.value = (mid - self.width * self.std.value, mid, mid + self.width * self.std.value)
+        mid = rolling_mean(values, self.std.period)
+        return mid - self.width * std, mid, mid + self.width * std
+
+
+class ATR:
+    """Average True Range (Wilder-Glättung)."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.warmup = SMA(period)
+        self.prev_close = None
+        self.value = None
+
+    def update(self, high, low, close):
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        if self.value is None:
+            self.value = self.warmup.update(tr)
+        else:
+            self.value += (tr - self.value) / self.period
+        return self.value
+
+    def seed(self, high, low, close):
+        high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+        prev_close = np.concatenate(([np.nan], close[:-1]))
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        out = np.full(len(tr), np.nan)
+        if len(tr):
+            self.prev_close = float(close[-1])
+        if len(tr) < self.period:
+            for x in tr:
+                self.warmup.update(x)
+            return out
+        out[self.period - 1] = tr[:self.period].mean()
+        for i in range(self.period, len(tr)):
+            out[i] = out[i - 1] + (tr[i] - out[i - 1]) / self.period
+        self.value = float(out[-1])
+        return out
+
+
+def _epoch_seconds(timestamps):
+    """Bar-Zeitstempel (Epoch-Sekunden aus dem Ringpuffer, datetime/Timestamp) → int64-Array."""
+    values = np.asarray(timestamps)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(np.int64)
+    ts = pd.to_datetime(pd.Series(values), utc=True).dt.tz_convert(None)
+    return ts.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def session_ids(timestamps):
+    """Handelstag je Bar (Tage seit Epoch), Tageswechsel um 9:30 New York – vektorisiert."""
+    local = pd.to_datetime(_epoch_seconds(timestamps), unit="s", utc=True).tz_convert(MARKET_TZ).tz_localize(None)
+    return (local - SESSION_OPEN).to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+
+def session_id(timestamp):
+    epoch = timestamp if isinstance(timestamp, (int, float, np.number)) else pd.Timestamp(timestamp).timestamp()
+    local = datetime.fromtimestamp(int(epoch), MARKET_TZ).replace(tzinfo=None)
+    return ((local - SESSION_OPEN).date() - datetime(1970, 1, 1).date()).days
+
+
+class VWAP:
+    """
+    Volumengewichteter Durchschnittspreis aus dem typischen Preis (H+L+C)/3.
+    Mit Zeitstempeln beginnt er mit jeder Sitzung (9:30 New York) neu, statt über den ganzen Seed zu laufen.
+    """
+
+    def __init__(self):
+        self.session = None
+        self.reset()
+
+    def reset(self):
+        self.pv = 0.0
+        self.volume = 0.0
+        self.value = None
+
+    def update(self, high, low, close, volume, timestamp=None):
+        if timestamp is not None:
+            session = session_id(timestamp)
+            if session != self.session:
+                self.reset()
+                self.session = session
+        self.pv += (high + low + close) / 3 * volume
+        self.volume += volume
+        if self.volume > 0:
+            self.value = self.pv / self.volume
+        return self.value
+
+    def seed(self, highs, lows, closes, volumes, timestamps=None):
+        highs, lows, closes, volumes = (np.asarray(a, dtype=np.float64) for a in (highs, lows, closes, volumes))
+        pv = (highs + lows + closes) / 3 * volumes
+        cum_pv, cum_vol = np.cumsum(pv), np.cumsum(volumes)
+        self.reset()
+        if timestamps is not None and len(pv):
+            # kumulierte Summen je Sitzung: vom Gesamtlauf den Stand vor Sitzungsbeginn abziehen
+            sessions = session_ids(timestamps)
+            starts = np.flatnonzero(np.r_[True, sessions[1:] != sessions[:-1]])
+            first = np.repeat(starts, np.diff(np.r_[starts, len(pv)]))
+            cum_pv = cum_pv - (cum_pv[first] - pv[first])
+            cum_vol = cum_vol - (cum_vol[first] - volumes[first])
+            self.session = int(sessions[-1])
+        if len(pv):
+            self.pv, self.volume = float(cum_pv[-1]), float(cum_vol[-1])
+            self.value = self.pv / self.volume if self.volume > 0 else None
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(cum_vol > 0, cum_pv / cum_vol, np.nan)
+
+
+def rolling_mean(values, period):
+    """Vektorisierter gleitender Durchschnitt (NaN bis genug Werte vorliegen)."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        csum = np.cumsum(np.concatenate(([0.0], values)))
+        out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def rolling_std(values, period):
+    """Vektorisierte gleitende Standardabweichung (Populations-Std wie RollingStd)."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(values, period)
+        out[period - 1:] = windows.std(axis=1)
+    return out
+
+
+def _has_column(bars, name):
+    if isinstance(bars, np.ndarray):
+        return bars.dtype.names is not None and name in bars.dtype.names
+    return name in bars
+
+
+class IndicatorSet:
+    """Bündelt die Indikatoren eines Symbols; wird pro abgeschlossener Bar fortgeschrieben."""
+
+    def __init__(self, ma_period=20, atr_period=14, bollinger_width=2.0):
+        self.ma_period = ma_period
+        self.atr_period = atr_period
+        self.bollinger_width = bollinger_width
+        self.reset()
+
+    def reset(self):
+        ma_period = self.ma_period
+        self.sma = SMA(ma_period)
+        self.ema = EMA(ma_period)
+        self.bollinger = BollingerBands(ma_period, self.bollinger_width)
+        self.atr = ATR(self.atr_period)
+        self.vwap = VWAP()
+        self.last_close = None
+
+    def update(self, bar):
+        close = bar["close"]
+        self.sma.update(close)
+        self.ema.update(close)
+        self.bollinger.update(close)
+        self.atr.update(bar["high"], bar["low"], close)
+        self.vwap.update(bar["high"], bar["low"], close, bar["volume"], bar["timestamp"])
+        self.last_close = close
+
+    def seed(self, bars):
+        """Bulk-Initialisierung aus Bar-Array (BarAggregator), DataFrame oder Liste von Bar-Dicts."""
+        self.reset()
+        if not len(bars):
+            return
+        if isinstance(bars, list):
+            bars = {col: [b[col] for b in bars] for col in ("timestamp", "close", "high", "low", "volume")
+                    if col in bars[0]}
+        # strukturiertes Array/DataFrame: spaltenweise, ohne Kopie bei float64
+        closes, highs, lows, volumes = (np.asarray(bars[col], dtype=np.float64)
+                                        for col in ("close", "high", "low", "volume"))
+        self.sma.seed(closes)
+        self.ema.seed(closes)
+        self.bollinger.seed(closes)
+        self.atr.seed(highs, lows, closes)
+        timestamps = bars["timestamp"] if _has_column(bars, "timestamp") else None
+        self.vwap.seed(highs, lows, closes, volumes, timestamps)
+        self.last_close = float(closes[-1])
@@ -0,0 +1,184 @@
+import asyncio
+import functools
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from helper.log_utils import get_logger, log_event
+
+# Zusammenfassung alle N Sekunden ins Log (0 = aus); Prometheus-Text auf METRICS_PORT (leer = aus)
+METRICS_INTERVAL = float(os.getenv("METRICS_INTERVAL", "300"))
+METRICS_PORT = os.getenv("METRICS_PORT")
+
+log = get_logger("latency")
+
+
+class LatencyHistogram:
+    """
+    Histogramm mit logarithmischen Buckets (HDR-Prinzip): Werte in µs, je Zweierpotenz
+    `sub_buckets` Unterteilungen → relative Auflösung ~2**(1/sub_buckets)-1 (≈4,4 % bei 16).
+    Aufzeichnen ist O(1) und unabhängig von der Anzahl der Messwerte.
+    """
+
+    def __init__(self, sub_buckets=16, max_us=600e6):
+        self.sub_buckets = sub_buckets
+        self.counts = [0] * (self._index(max_us) + 1)
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+        self.lock = threading.Lock()
+
+    def _index(self, value_us):
+        return 0 if value_us < 1 else int(math.log2(value_us) * self.sub_buckets) + 1
+
+    def _upper(self, index):
+        return 1.0 if index == 0 else 2 ** (index / self.sub_buckets)
+
+    def record(self, value_us):
+        index = min(self._index(value_us), len(self.counts) - 1)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_us += value_us
+            if value_us > self.max_us:
+                self.max_us = value_us
+
+    def percentile(self, q):
+        """Obere Bucket-Grenze des q-Quantils (0–100) in µs."""
+        if not self.count:
+            return 0.0
+        target = math.ceil(self.count * q / 100)
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self._upper(index), self.max_us)
+        return self.max_us
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_us / self.count / 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) / 1000, 3),
+            "p99_ms": round(self.percentile(99) / 1000, 3),
+            "max_ms": round(self.max_us / 1000, 3),
+        }
+
+
+class Metrics:
+    """Sammelt Stage-Histogramme und Zähler; `timer`/`timed` sind der gemeinsame Mess-Hook."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def histogram(self, stage):
+        hist = self.histograms.get(stage)
+        if hist is None:
+            with self.lock:
+                hist = self.histograms.setdefault(stage, LatencyHistogram())
+        return hist
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).record(seconds * 1e6)
+
+    def incr(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """Decorator für Funktionen und Coroutines: misst jeden Aufruf unter `stage`."""
+        def decorator(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        self.observe(stage, time.perf_counter() - start)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "counters": dict(self.counters),
+            "stages": {stage: hist.snapshot() for stage, hist in sorted(self.histograms.items())},
+        }
+
+    def log_summary(self):
+        summary = self.summary()
+        if log.isEnabledFor(logging.INFO):
+            lines = [f"{stage}: n={s['count']} p50={s['p50_ms']}ms p99={s['p99_ms']}ms max={s['max_ms']}ms"
+                     for stage, s in summary["stages"].items()]
+            log_event(log, logging.INFO, "[METRICS] " + " | ".join(lines), event="metrics", **summary)
+
+    async def run_reporter(self, interval=METRICS_INTERVAL):
+        while interval > 0:
+            await asyncio.sleep(interval)
+            self.log_summary()
+
+    def prometheus_text(self):
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            metric = f"mi_trade_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        lines.append("# TYPE mi_trade_stage_latency_seconds summary")
+        for stage, hist in sorted(self.histograms.items()):
+            for q in (0.5, 0.99):
+                lines.append(f'mi_trade_stage_latency_seconds{{stage="{stage}",quantile="{q}"}} '
+                             f"{hist.percentile(q * 100) / 1e6:.6f}")
+            lines.append(f'mi_trade_stage_latency_seconds_sum{{stage="{stage}"}} {hist.total_us / 1e6:.6f}')
+            lines.append(f'mi_trade_stage_latency_seconds_count{{stage="{stage}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    async def serve_prometheus(self, host="127.0.0.1", port=9108):
+        """Minimaler HTTP-Endpunkt (jede Anfrage → Prometheus-Textformat), läuft auf dem Bot-Loop."""
+        async def handle(reader, writer):
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                pass
+            body = self.prometheus_text().encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        log.info("[METRICS] Prometheus-Endpunkt auf http://%s:%s/metrics", host, port)
+        return server
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+# gemeinsame Instanz für Bot, Trader, NewsWatcher und Logger
+metrics = Metrics()
+timer = metrics.timer
+timed = metrics.timed
+incr = metrics.incr
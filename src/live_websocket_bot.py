@@ -1,58 +1,110 @@
 
+import argparse
 import asyncio
+import logging
 import os
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from types import SimpleNamespace
 
 import pandas as pd
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.live import StockDataStream
-from alpaca.data.requests import StockBarsRequest
+
 from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
-from alpaca.trading.client import TradingClient
 
-from news_watcher import NewsWatcher
-from trading_bot import MLTrader
+# zuerst: lädt .env, bevor die übrigen Module ihre Env-Konstanten lesen
+from helper.config import get_bar_store, get_stream, get_trading_client, get_trading_stream, override, reset
+from async_broker import AsyncBroker
+from market_scheduler import MarketScheduler
+from news_watcher import NEUTRAL_SENTIMENT, NewsWatcher
+from order_manager import OrderManager
+from position_ledger import PositionLedger
+from stream_supervisor import StreamSupervisor
+from tick_coalescer import TickCoalescer
+from trading_bot import MLTrader, StrategyParams, ORDER_LABELS
 from trading_logger import TradeLogger
 
+from helper.log_utils import get_logger, log_event
+from latency import METRICS_INTERVAL, METRICS_PORT, incr, metrics, timer
+from market_replay import MarketRecorder, Recording, ReplayClient, ReplayStream
 from helper.utils import convert_to_german_time
 
-load_dotenv()
-
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
-SYMBOL = "TSLA"
+# Handelsuniversum, z. B. SYMBOLS="TSLA,AAPL,NVDA"
+SYMBOLS = [s.strip().upper() for s in os.getenv("SYMBOLS", "TSLA").split(",") if s.strip()]
+# Suchbegriffe für NewsAPI (Standard: das Symbol selbst)
+NEWS_QUERIES = {"TSLA": "Tesla", "AAPL": "Apple", "NVDA": "Nvidia", "MSFT": "Microsoft", "AMZN": "Amazon"}
+# Auswertung höchstens alle N ms pro Symbol (0 = jeden Trade auswerten)
+COALESCE_INTERVAL_MS = int(os.getenv("COALESCE_INTERVAL_MS", "500"))
+# Stop-Loss/Take-Profit als Bracket-Order beim Broker (USE_BRACKETS=0 → reine Market-Orders)
+STRATEGY = StrategyParams(use_brackets=os.getenv("USE_BRACKETS", "1") == "1")
+# offene Positionen kurz vor Handelsschluss glattstellen (Zeitpunkt: CLOSE_BUFFER_MINUTES)
+FLATTEN_AT_CLOSE = os.getenv("FLATTEN_AT_CLOSE", "0") == "1"
 
 LOG_FILE = Path("order_log.csv")
+BAR_TIMEFRAME = TimeFrame(amount=5, unit=TimeFrameUnit.Minute)
 
-client = TradingClient(API_KEY, API_SECRET, paper=True)
-data_client = StockHistoricalDataClient(API_KEY, API_SECRET)
-stream = StockDataStream(API_KEY, API_SECRET)
+log = get_logger("bot")
 
 
 class LiveWebSocketBot:
-    def __init__(self):
-        self.trader = MLTrader(symbol=SYMBOL)
-        self.news_watcher = NewsWatcher(self.trader)
-        self.last_order_time = datetime.min
-        self.order_cooldown = timedelta(seconds=30)
+    def __init__(self, replay=False, clock=None):
+        # Replay: kein Markt-Check, kein Trade-Update-Stream, keine News – nur aufgezeichnete Trades
+        self.replay = replay
+        # eine Uhr (Sekunden) für Coalescing, Order-Cooldown und In-flight-Timeout; im Replay die
+        # Aufzeichnungszeit, damit jedes Tempo dieselben Orders auslöst; live die monotone Uhr
+        self.clock = clock or (get_stream().now if replay else None)
+        # Clients kommen aus der Registry (helper.config) und werden erst hier erzeugt
+        client = get_trading_client()
+        self.ledger = PositionLedger(client)
+        self.load_ledger()
+        # pro Symbol ein MLTrader mit eigenem Bar-Puffer und eigenem Entscheidungszustand
+        self.traders = {
+            symbol: MLTrader(symbol=symbol, ledger=self.ledger, news_query=NEWS_QUERIES.get(symbol, symbol),
+                             params=STRATEGY, trading_client=client)
+            for symbol in SYMBOLS
+        }
+        self.broker = AsyncBroker()
+        self.order_manager = OrderManager(self.broker, clock=self.clock)
+        self.news_watcher = NewsWatcher(list(self.traders.values()))
+        self.last_order_time = {symbol: float("-inf") for symbol in SYMBOLS}
+        self.order_cooldown = STRATEGY.order_cooldown
         self.logger = TradeLogger(LOG_FILE)
+        self.coalescer = TickCoalescer(self.on_trade, COALESCE_INTERVAL_MS, on_tick=self.ingest_trade,
+                                       clock=self.clock)
+        self.seeding = {}  # symbol -> während des Seedens gepufferte Trades
+        self.recorder = None  # MarketRecorder: wird nach einem Reconnect an den neuen Stream gehängt
+        self.supervisor = StreamSupervisor(self.make_stream, self.coalescer.on_trade, SYMBOLS,
+                                           on_gap=self.backfill_gap)
+        # Handelszeiten aus dem Alpaca-Kalender statt get_clock-Polling
+        self.scheduler = MarketScheduler(self.warm_up, self.open_session, self.close_session)
+        self.session_tasks = []
+        # Trade-Updates (Fills) laufen über Tage; Trade-Updates sind selten → keine Stall-Erkennung
+        self.trade_updates = StreamSupervisor(self.make_trading_stream, self.on_trade_update, SYMBOLS,
+                                              on_gap=self.reconcile_gap, stall_timeout=0,
+                                              subscribe=lambda stream, handler: stream.subscribe_trade_updates(handler),
+                                              name="trade_updates")
+        self.trade_updates_task = None
         self.log_existing_positions()
 
+    def load_ledger(self):
+        try:
+            self.ledger.load()
+        except Exception as e:
+            log.error("[INIT] Error loading positions/cash: %s", e)
+
     def log_existing_positions(self):
         try:
-            positions = self.trader.client.get_all_positions()
+            positions = self.ledger.all_positions()
             if not positions:
-                print("[INIT] No open positions found.")
+                log.info("[INIT] No open positions found.")
             else:
-                print("[INIT] Existing positions:")
+                log.info("[INIT] Existing positions:")
                 for p in positions:
-                    print(f"  ➤ {p.symbol}: {p.qty} shares @ {p.avg_entry_price}")
-                    if p.symbol == SYMBOL:
+                    log.info("  ➤ %s: %s shares @ %s", p.symbol, p.qty, p.avg_entry_price)
+                    if p.symbol in self.traders:
                         qty = float(p.qty)
                         direction = "LONG" if qty > 0 else "SHORT"
-                        print(f"[INIT] Detected: {direction} position for {SYMBOL}")
+                        log.info("[INIT] Detected: %s position for %s", direction, p.symbol)
 
                         # Log initial state
                         self.logger.log(
@@ -62,158 +114,280 @@ class LiveWebSocketBot:
                             price=float(p.avg_entry_price),
                             sentiment="init",
                             trend="init",
-                            cash=self.trader.get_cash()
+                            cash=self.ledger.get_cash()
                         )
         except Exception as e:
-            print(f"[INIT] Error retrieving positions: {e}")
+            log.error("[INIT] Error retrieving positions: %s", e)
 
-    def fetch_latest_bars(self, symbol="TSLA"):
+    def fetch_latest_bars(self, symbols, lookback=timedelta(days=5)):
+        """
+        Lädt historische 5-Minuten-Bars (blockierend, läuft im Broker-Pool).
+        Alle fehlenden Symbole werden in einer einzigen REST-Anfrage geholt.
+        """
         end = datetime.utcnow()
-        start = end - timedelta(minutes=60)
-
-        request_params = StockBarsRequest(
-            symbol_or_symbols=symbol,
-            timeframe=TimeFrame(amount=5, unit=TimeFrameUnit.Minute),
-            start=start,
-            end=end,
-            feed='iex'
-        )
-
-        bars = data_client.get_stock_bars(request_params).df
-
-        if isinstance(bars.index, pd.MultiIndex):
-            bars = bars.reset_index()
-        if isinstance(bars.columns, pd.MultiIndex):
-            bars.columns = bars.columns.get_level_values(-1)
-        if "symbol" in bars.columns:
-            bars = bars[bars["symbol"] == symbol]
-
-        bars = bars.sort_values("timestamp")
-        self.trader.historical_data = bars
+        start = end - lookback
+
+        # aus dem lokalen Bar-Store; per REST wird nur der fehlende Zeitraum geladen
+        bars = get_bar_store().get_bars(list(symbols), start, end, BAR_TIMEFRAME)
+        if not bars.empty:
+            bars = bars.sort_values("timestamp")
         return bars
 
+    async def refresh_bars(self, symbols):
+        """
+        Lädt Bars im Broker-Pool und seedet damit Bar-Aggregatoren und Indikatoren auf dem Loop.
+        Wird nur beim Start und nach Datenlücken aufgerufen, nicht pro Trade. Trades, die während
+        der Anfrage eintreffen, werden gepuffert und nach dem Seeden nachgespielt – der Loop
+        ändert Bars und Indikatoren also nie gleichzeitig mit dem Seed.
+        """
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        for symbol in symbols:
+            self.seeding.setdefault(symbol, [])
+        try:
+            bars = await self.broker.run(self.fetch_latest_bars, symbols)
+            for symbol in symbols:
+                symbol_bars = bars[bars["symbol"] == symbol] if "symbol" in bars.columns else bars
+                trader = self.traders[symbol]
+                trader.seed_bars(symbol_bars)
+                log.info("[BARS] %d Bars für %s geladen.", trader.bar_aggregator.count, symbol)
+        finally:
+            for symbol in symbols:
+                trader = self.traders[symbol]
+                for data in self.seeding.pop(symbol, ()):
+                    trader.update_bars(data.price, data.size, data.timestamp)
+
+    def now(self):
+        return self.clock() if self.clock else time.monotonic()
+
+    def ingest_trade(self, data):
+        """
+        Billiger Pfad für jeden einzelnen Trade: rollt die Bars weiter.
+        Gibt True zurück, wenn mit diesem Trade eine Bar abgeschlossen wurde.
+        """
+        incr("ticks")
+        pending = self.seeding.get(data.symbol)
+        if pending is not None:
+            pending.append(data)
+            return False
+        # ruhige Phasen ohne Trades sind keine Lücke (auch Alpacas REST-Bars lassen leere Intervalle
+        # aus); nachgeladen wird nur nach einem Stream-Ausfall (StreamSupervisor → backfill_gap)
+        return self.traders[data.symbol].update_bars(data.price, data.size, data.timestamp) is not None
+
     async def on_trade(self, data):
-        print("=" * 40)
-        print(f"[DEBUG] Trade Event erhalten: {data.symbol} @ {data.price}")
-        print("=" * 40)
+        started = time.perf_counter()
+        symbol = data.symbol
+        trader = self.traders[symbol]
         price = data.price
-        now = datetime.utcnow()
-        print(f"[Live Trade] {data.symbol} @ {price}")
-
-        self.fetch_latest_bars()
-        trend = self.trader.get_price_trend_from_data()
-        candle_signal = self.trader.get_candlestick_signal()
-        probability, sentiment = self.trader.cached_sentiment or (0.5, "neutral")
-
-        position = self.trader.get_position()
+        now = self.now()
+        # Ausgaben pro Tick nur auf DEBUG (LOG_LEVEL=DEBUG)
+        log.debug("[Live Trade] %s @ %s", symbol, price)
+
+        trend = trader.get_price_trend_from_data()
+        candle_signal = trader.get_candlestick_signal()
+        # Snapshot wird vom NewsWatcher auf demselben Loop als Ganzes ersetzt → lock-freies Lesen
+        probability, sentiment, _ = trader.cached_sentiment or NEUTRAL_SENTIMENT
+
+        # Position und Cash parallel im Broker-Pool abfragen (blockiert den Loop nicht)
+        with timer("bot.position_cash"):
+            position, available_cash = await self.broker.get_state(trader)
         position_qty = abs(float(position.qty)) if position else 0
         is_short = position and float(position.qty) < 0
-        cash = round(self.trader.get_cash(), 2)
-
-        # 👉 Ausgabe des strukturierten Info-Logs
-        self.logger.generate_info_log(price, trend, candle_signal, sentiment, position, decision=None)
-
-        decision = self.trader.make_decision(sentiment, trend, candle_signal)
-        print(f"[Decision] → {decision.upper()}")
-
-        # Aktualisiertes Log mit finaler Entscheidung
-        self.logger.generate_info_log(price, trend, candle_signal, sentiment, position, decision)
-
-        if now - self.last_order_time < self.order_cooldown:
-            print("[INFO] Cooldown aktiv – kein Trade ausgeführt.")
+        cash = round(available_cash, 2)
+
+        decision = trader.make_decision(sentiment, trend, candle_signal)
+        incr("decisions")
+        log.debug("[Decision] %s → %s", symbol, decision.upper())
+
+        # Info-Log nur bei geänderter Entscheidung
+        self.logger.generate_info_log(price, trend, candle_signal, sentiment, position, decision, symbol=symbol)
+
+        if now - self.last_order_time[symbol] < self.order_cooldown:
+            action, quantity, reason = None, 0, "[INFO] Cooldown aktiv – kein Trade ausgeführt."
+        elif self.order_manager.has_inflight(symbol):
+            action, quantity, reason = None, 0, f"[INFO] Order für {symbol} noch offen – kein neues Signal."
+        else:
+            action, quantity, reason = trader.plan_order(decision, position_qty, is_short, available_cash, price)
+
+        self.logger.log_decision(symbol, price, trend, candle_signal, sentiment, probability, position_qty,
+                                 decision, action, quantity, reason, getattr(data, "timestamp", None), started)
+        metrics.observe("bot.tick_to_decision", time.perf_counter() - started)
+        if action is None:
+            if reason:
+                log.debug(reason)
             return
 
-        if decision == "buy":
-            if is_short:
-                order = self.trader.create_order(SYMBOL, position_qty, "buy")
-                self.trader.submit_order(order)
-                self.last_order_time = now
-                print(f"[ORDER] CLOSE SHORT {position_qty} shares @ {price}")
-                self.logger.log("BUY-CLOSE", SYMBOL, position_qty, price, sentiment, trend, cash)
-            elif position_qty == 0:
-                quantity = int(self.trader.get_cash() // price)
-                if quantity > 0:
-                    order = self.trader.create_order(SYMBOL, quantity, "buy")
-                    self.trader.submit_order(order)
-                    self.last_order_time = now
-                    print(f"[ORDER] BUY {quantity} shares @ {price}")
-                    self.logger.log("BUY", SYMBOL, quantity, price, sentiment, trend, cash)
-                else:
-                    print("[INFO] Nicht genug Kapital zum Kauf.")
-
-        elif decision == "sell":
-            if not is_short and position_qty > 0:
-                order = self.trader.create_order(SYMBOL, position_qty, "sell")
-                self.trader.submit_order(order)
-                self.last_order_time = now
-                print(f"[ORDER] SELL {position_qty} shares @ {price}")
-                self.logger.log("SELL-CLOSE", SYMBOL, position_qty, price, sentiment, trend, cash)
-            elif position_qty == 0:
-                quantity = int(self.trader.get_cash() // price)
-                if quantity > 0:
-                    order = self.trader.create_order(SYMBOL, quantity, "sell")
-                    self.trader.submit_order(order)
-                    self.last_order_time = now
-                    print(f"[ORDER] OPEN SHORT {quantity} shares @ {price}")
-                    self.logger.log("SELL-OPEN", SYMBOL, quantity, price, sentiment, trend, cash)
-                else:
-                    print("[INFO] Nicht genug Kapital für Short-Sell.")
-            else:
-                print("[WARNUNG] SELL-Signal aber keine logische Aktion möglich.")
-
-    def check_market_status(self):
-        is_open = False
-        try:
-            clock = self.trader.client.get_clock()
-            is_open = clock.is_open
-            if not is_open:
-                print(f"🕒 [MARKET] The market is currently closed and will reopen at "
-                      f"{convert_to_german_time(clock.next_open, clock.next_close)}")
-            else:
-                print("✅ [MARKET] The market is open.")
-        except Exception as e:
-            print(f"[ERROR] Could not retrieve market status: {e}")
-
-        return is_open
+        with timer("bot.submit_order"):
+            response = await self.order_manager.submit(trader, action, quantity, price,
+                                                       getattr(data, "timestamp", now))
+        if response is None:
+            return
+        metrics.observe("bot.tick_to_order", time.perf_counter() - started)
+        incr("orders")
+        self.last_order_time[symbol] = now
+        log_event(log, logging.INFO, f"[ORDER] {ORDER_LABELS[action]} {quantity} shares @ {price}",
+                  event="order", symbol=symbol, action=action, qty=quantity, price=price)
+        self.logger.log(action, symbol, quantity, price, sentiment, trend, cash)
+
+    def make_stream(self):
+        """Erster Aufruf: Stream aus der Registry; nach einem Reconnect ein frischer."""
+        if self.supervisor.stream is not None:
+            reset("stream")
+            stream = get_stream()
+            if self.recorder:
+                self.recorder.attach_stream(stream)
+            return stream
+        return get_stream()
+
+    async def backfill_gap(self, symbols, gap):
+        """Lädt nach einem Stream-Ausfall die Bars aller Symbole in einer Anfrage nach."""
+        log.info("[BARS] Stream-Lücke von %.0f s – lade Bars für %s nach.", gap, ", ".join(symbols))
+        await self.refresh_bars(symbols)
+
+    def make_trading_stream(self):
+        if self.trade_updates.stream is not None:
+            reset("trading_stream")
+        return get_trading_stream()
+
+    async def reconcile_gap(self, symbols, gap):
+        """Während eines Ausfalls des Trade-Update-Streams können Fills fehlen → Ledger per REST abgleichen."""
+        log.info("[LEDGER] Trade-Updates %.0f s unterbrochen – gleiche Positionen/Cash ab.", gap)
+        await self.ledger.reconcile()
+
+    async def on_trade_update(self, data):
+        # Ledger bucht Fills, der OrderManager gibt abgeschlossene Orders frei
+        await self.ledger.on_trade_update(data)
+        await self.order_manager.on_trade_update(data)
+
+    def start_news_watcher(self):
+        if self.news_watcher.task is None or self.news_watcher.task.done():
+            log.info("[BOT] Starting NewsWatcher...")
+            self.news_watcher.start()
 
-    async def monitor_market_close(self):
-        while True:
+    async def warm_up(self, session):
+        """Vor der Eröffnung: Positionen/Cash, Bars (Bar-Store), Trade-Updates, Sentiment-Modell."""
+        log.info("[MARKET] Warm-up für die Sitzung %s", convert_to_german_time(session.open, session.close))
+        # zuerst: hängt nicht am REST, das unten scheitern kann (Scheduler wiederholt das Warm-up dann)
+        if self.trade_updates_task is None or self.trade_updates_task.done():
+            log.info("[BOT] Starting trade updates stream...")
+            self.trade_updates_task = asyncio.create_task(self.trade_updates.run())
+
+        await self.broker.run(self.load_ledger)
+        log.info("[BOT] Loading historical bars...")
+        await self.refresh_bars(SYMBOLS)
+
+        if datetime.now(timezone.utc) < session.open:
+            # genug Vorlauf: Sentiment-Dienst/FinBERT schon jetzt laden und erste News holen
+            self.start_news_watcher()
+
+    async def open_session(self, session):
+        log.info("✅ [MARKET] The market is open.")
+        log.info("[BOT] Starting WebSocket stream...")
+        self.session_tasks = [asyncio.create_task(self.supervisor.run()),
+                              asyncio.create_task(self.ledger.run_reconciler())]
+        # Supervisor abonniert sofort; ein Start mitten in der Sitzung lädt das Modell erst danach,
+        # weil der Sentiment-Dienst bzw. das FinBERT-Warm-up sonst mit dem Abo konkurriert
+        await asyncio.sleep(0)
+        self.news_watcher.market_open = True
+        self.start_news_watcher()
+
+    async def close_session(self, session):
+        log.info("🔒 [MARKET] Handelsschluss um %s – beende die Sitzung.", convert_to_german_time(session.open,
+                                                                                              session.close))
+        if FLATTEN_AT_CLOSE:
+            await self.flatten_positions(session)
+        self.supervisor.stop()
+        self.news_watcher.stop()
+        self.news_watcher.market_open = False
+        for task in self.session_tasks:
+            task.cancel()
+        await asyncio.gather(*self.session_tasks, return_exceptions=True)
+        self.session_tasks = []
+        log_event(log, logging.INFO, "[STATS] Ticks", event="tick_stats", **self.coalescer.stats())
+        metrics.log_summary()
+
+    async def flatten_positions(self, session):
+        """Stellt alle Positionen der gehandelten Symbole vor Handelsschluss glatt (FLATTEN_AT_CLOSE=1)."""
+        for p in self.ledger.all_positions():
+            trader = self.traders.get(p.symbol)
+            qty = float(p.qty)
+            if trader is None or not qty:
+                continue
+            action = "SELL-CLOSE" if qty > 0 else "BUY-CLOSE"
+            current = trader.bar_aggregator.current
+            price = current.close if current else float(p.avg_entry_price)
             try:
-                clock = self.trader.client.get_clock()
-                if not clock.is_open:
-                    print(f"🔒 [MARKET] The market has closed. "
-                          f"It will reopen at {convert_to_german_time(clock.next_open,clock.next_close)}. "
-                          f"Shutting down bot.")
-                    self.stop()
-                    break
+                response = await self.order_manager.submit(trader, action, abs(qty), price, f"flatten-{session.date}")
             except Exception as e:
-                print(f"[ERROR] Market monitoring failed: {e}")
-            await asyncio.sleep(60)  # alle 60 Sekunden prüfen
+                log.error("[ORDER] Glattstellen von %s fehlgeschlagen: %s", p.symbol, e)
+                continue
+            if response is None:
+                continue
+            log_event(log, logging.INFO, f"[ORDER] {ORDER_LABELS[action]} {abs(qty)} shares @ {price} (Flatten)",
+                      event="order", symbol=p.symbol, action=action, qty=abs(qty), price=price)
+            self.logger.log(action, p.symbol, abs(qty), price, "flatten", "flatten", self.ledger.get_cash())
 
     async def start(self):
-        market_open = self.check_market_status()
-        asyncio.create_task(self.monitor_market_close())
-
-        if market_open:
-            print("[BOT] Starting NewsWatcher...")
-            self.news_watcher.start()
+        asyncio.create_task(metrics.run_reporter(METRICS_INTERVAL))
+        if METRICS_PORT:
+            await metrics.serve_prometheus(port=int(METRICS_PORT))
+
+        if self.replay:
+            # Replay: kein Kalender – Bars laden und die Aufzeichnung direkt abspielen
+            log.info("[BOT] Loading historical bars...")
+            await self.refresh_bars(SYMBOLS)
+            log.info("[BOT] Starting WebSocket stream...")
+            stream = get_stream()
+            stream.subscribe_trades(self.coalescer.on_trade, *SYMBOLS)
+            await stream._run_forever()
+            await self.coalescer.flush()
+            return
 
-            print("[BOT] Starting WebSocket stream...")
-            stream.subscribe_trades(self.on_trade, SYMBOL)
-            try:
-                await stream._run_forever()
-            except asyncio.exceptions.TimeoutError:
-                print("[INFO] WebSocket Timeout beim Shutdown – ignoriert.")
+        # läuft über Tage: Warm-up, Eröffnung und Handelsschluss per Timer, dazwischen Leerlauf
+        await self.scheduler.run()
 
     def stop(self):
+        self.scheduler.stop()
+        self.supervisor.stop()
+        self.trade_updates.stop()
         self.news_watcher.stop()
-        self.news_watcher.join()
+        self.broker.shutdown()
+        self.logger.close()
+        log_event(log, logging.INFO, "[STATS] Ticks", event="tick_stats", **self.coalescer.stats())
+        metrics.log_summary()
 
 
 if __name__ == "__main__":
-    bot = LiveWebSocketBot()
+    parser = argparse.ArgumentParser(description="Live-Trading-Bot (Alpaca WebSocket)")
+    parser.add_argument("--record", help="Stream-Nachrichten und REST-Antworten nach PATH (.jsonl.gz) aufzeichnen")
+    parser.add_argument("--replay", help="Aufzeichnung statt Live-Stream abspielen (ohne echte Orders)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay-Tempo: 1 = Original, N = N-fach, 0 = max")
+    args = parser.parse_args()
+
+    recorder = None
+    if args.replay:
+        recording = Recording.load(args.replay)
+        stream = override("stream", ReplayStream(recording, args.speed))
+        replay_client = override("trading", ReplayClient(recording, stream, defaults={
+            "get_all_positions": [], "get_account": SimpleNamespace(cash="100000"), "get_orders": []}))
+        override("bar_store", ReplayClient(recording, defaults={"get_bars": pd.DataFrame()}))
+    elif args.record:
+        recorder = MarketRecorder(args.record)
+        recorder.attach_stream(get_stream())  # weitere Streams nach Reconnects hängt der Bot selbst an
+        override("trading", recorder.wrap(get_trading_client(), "get_calendar", "get_account",
+                                                  "get_all_positions"))
+        override("bar_store", recorder.wrap(get_bar_store(), "get_bars"))
+
+    bot = LiveWebSocketBot(replay=bool(args.replay))
+    bot.recorder = recorder
+    if args.replay:
+        replay_client.ledger = bot.ledger  # simulierte Fills buchen
     try:
         asyncio.run(bot.start())
+        if args.replay:
+            bot.stop()
     except KeyboardInterrupt:
-        print("\n[STOP] Stopping bot...")
+        log.info("[STOP] Stopping bot...")
         bot.stop()
+    finally:
+        if recorder:
+            recorder.close()
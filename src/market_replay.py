@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pandas as pd
+from alpaca.data.models import Trade
+
+from helper.log_utils import get_logger
+from latency import incr, metrics
+
+log = get_logger("replay")
+
+
+def _ns(value):
+    """Zeitstempel aus msgpack (Timestamp), datetime oder pandas → Nanosekunden seit Epoch."""
+    if hasattr(value, "to_unix_nano"):
+        return value.to_unix_nano()
+    return pd.Timestamp(value).value
+
+
+def _encode(value):
+    if isinstance(value, pd.DataFrame):
+        return {"__df__": value.to_json(orient="split", date_format="iso", date_unit="ns")}
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if "__df__" in value:
+            df = pd.read_json(value["__df__"], orient="split")
+            if "timestamp" in df.columns:
+                df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+            return df
+        return SimpleNamespace(**{k: _decode(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+class MarketRecorder:
+    """
+    Zeichnet die rohen StockDataStream-Nachrichten und REST-Antworten als gzip-JSONL auf.
+    Jede Zeile: {"type": "ws"|"rest", "ts": Empfangszeit in ns (monoton, ab Start), ...}.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.start = time.monotonic_ns()
+        self.messages = 0
+
+    def _write(self, entry):
+        entry["ts"] = time.monotonic_ns() - self.start
+        self.file.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+
+    def attach_stream(self, stream):
+        """Hängt sich vor `_dispatch` des Streams; jede Nachricht wird vor der Verarbeitung geschrieben."""
+        dispatch = stream._dispatch
+
+        async def recording_dispatch(msg):
+            if msg.get("T") in ("t", "q", "b", "u", "d"):
+                raw = dict(msg)
+                if "t" in raw:
+                    raw["t"] = _ns(raw["t"])
+                self._write({"type": "ws", "msg": raw})
+                self.messages += 1
+            await dispatch(msg)
+
+        stream._dispatch = recording_dispatch
+        return stream
+
+    def wrap(self, obj, *methods):
+        """Proxy, der die Rückgaben der genannten Methoden mitschreibt und sonst durchreicht."""
+        return _RecordingProxy(self, obj, methods)
+
+    def record_rest(self, method, result):
+        self._write({"type": "rest", "method": method, "result": _encode(result)})
+
+    def close(self):
+        self.file.close()
+        log.info("[REPLAY] %d Nachrichten aufgezeichnet → %s", self.messages, self.path)
+
+
+class _RecordingProxy:
+    def __init__(self, recorder, obj, methods):
+        self._recorder = recorder
+        self._obj = obj
+        self._methods = set(methods)
+
+    def __getattr__(self, name):
+        attr = getattr(self._obj, name)
+        if name not in self._methods:
+            return attr
+
+        def recorded(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            self._recorder.record_rest(name, result)
+            return result
+        return recorded
+
+
+class Recording:
+    """Geladene Aufzeichnung: Stream-Nachrichten in Empfangsreihenfolge und REST-Antworten je Methode."""
+
+    def __init__(self, messages, rest):
+        self.messages = messages
+        self.rest = rest
+
+    @classmethod
+    def load(cls, path):
+        messages, rest = [], {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["type"] == "ws":
+                    messages.append((entry["ts"], entry["msg"]))
+                else:
+                    rest.setdefault(entry["method"], []).append(entry["result"])
+        return cls(messages, rest)
+
+
+class ReplayStream:
+    """
+    Drop-in für StockDataStream: spielt aufgezeichnete Trades in den registrierten Handler.
+    speed=1 → Originaltempo, speed=N → N-fach schneller, speed=0 → so schnell wie möglich.
+    Die Verspätung gegenüber dem Sollzeitpunkt landet im Histogramm "replay.lag"; steigt sie
+    stetig an, ist der Handler bei dieser Rate gesättigt.
+    """
+
+    def __init__(self, recording, speed=1.0):
+        self.recording = recording if isinstance(recording, Recording) else Recording.load(recording)
+        self.speed = speed
+        self.handlers = {}
+        self.last_price = {}
+        self.running = False
+        self.replayed = 0
+        self.elapsed = 0.0
+        self.replay_time = 0.0  # Empfangszeit der aktuellen Nachricht laut Aufzeichnung (s)
+
+    def now(self):
+        """Uhr in Aufzeichnungszeit, z. B. für TickCoalescer(clock=...)."""
+        return self.replay_time
+
+    def subscribe_trades(self, handler, *symbols):
+        for symbol in symbols:
+            self.handlers[symbol] = handler
+
+    async def _run_forever(self):
+        self.running = True
+        messages = [(ts, msg) for ts, msg in self.recording.messages if msg.get("T") == "t"]
+        if not messages:
+            return
+        first_ts = messages[0][0]
+        start = time.perf_counter()
+
+        for ts, msg in messages:
+            if not self.running:
+                break
+            handler = self.handlers.get(msg.get("S"), self.handlers.get("*"))
+            if handler is None:
+                continue
+
+            if self.speed > 0:
+                due = (ts - first_ts) / 1e9 / self.speed
+                delay = due - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                metrics.observe("replay.lag", max(time.perf_counter() - start - due, 0))
+            else:
+                await asyncio.sleep(0)  # dem Loop (Coalescer, Broker-Callbacks) Luft lassen
+
+            raw = dict(msg)
+            raw["t"] = datetime.fromtimestamp(raw["t"] / 1e9, timezone.utc) if "t" in raw else None
+            trade = Trade(raw["S"], raw)
+            self.last_price[trade.symbol] = trade.price
+            self.replay_time = ts / 1e9
+            self.replayed += 1
+            incr("replay.messages")
+            await handler(trade)
+
+        self.elapsed = time.perf_counter() - start
+        self.running = False
+        log.info("[REPLAY] %d Trades in %.2f s (%.0f/s, Speed %s)", self.replayed, self.elapsed,
+                 self.replayed / self.elapsed if self.elapsed else 0, self.speed or "max")
+
+    def stop(self):
+        self.running = False
+
+
+class ReplayClient:
+    """
+    Ersetzt TradingClient/BarStore im Replay: aufgezeichnete REST-Antworten werden der Reihe
+    nach zurückgegeben (die letzte wiederholt). Orders werden nicht gesendet, sondern zum letzten
+    Replay-Preis simuliert gefüllt und – falls gesetzt – ins Ledger gebucht.
+    """
+
+    def __init__(self, recording, stream=None, ledger=None, defaults=None):
+        self.recording = recording
+        self.stream = stream
+        self.ledger = ledger
+        self.defaults = defaults or {}
+        self.calls = {}
+        self.orders = []
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def replayed(*args, **kwargs):
+            results = self.recording.rest.get(name)
+            if not results:
+                if name in self.defaults:
+                    return self.defaults[name]
+                raise LookupError(f"Keine aufgezeichnete Antwort für {name}()")
+            index = self.calls.get(name, 0)
+            self.calls[name] = index + 1
+            return _decode(results[min(index, len(results) - 1)])
+        return replayed
+
+    def submit_order(self, order):
+        price = self.stream.last_price.get(order.symbol) if self.stream else None
+        side = getattr(order.side, "value", order.side)
+        self.orders.append(order)
+        if self.ledger is not None and price is not None:
+            self.ledger.apply_fill(order.symbol, side, float(order.qty), price)
+        return SimpleNamespace(id=str(len(self.orders)), client_order_id=getattr(order, "client_order_id", None),
+                               symbol=order.symbol, qty=order.qty, side=side, status="filled",
+                               filled_avg_price=price)
+
+
+def convert_trades(csv_path, out_path, symbol=None):
+    """Baut aus einer Trade-CSV (timestamp, price, size[, symbol]) eine abspielbare Aufzeichnung."""
+    trades = pd.read_csv(csv_path)
+    trades["timestamp"] = pd.to_datetime(trades["timestamp"], format="ISO8601", utc=True)
+    origin = trades["timestamp"].iloc[0].value
+    with gzip.open(out_path, "wt", encoding="utf-8") as f:
+        for i, t in enumerate(trades.itertuples(index=False)):
+            ns = t.timestamp.value
+            msg = {"T": "t", "S": getattr(t, "symbol", symbol), "i": i, "x": "V", "p": float(t.price),
+                   "s": float(t.size), "c": ["@"], "z": "C", "t": ns}
+            f.write(json.dumps({"type": "ws", "ts": ns - origin, "msg": msg}, separators=(",", ":")) + "\n")
+    return len(trades)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aufzeichnungen für den Replay-Modus prüfen/erstellen")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="Inhalt einer Aufzeichnung zusammenfassen")
+    info.add_argument("path")
+    convert = sub.add_parser("convert", help="Trade-CSV in eine Aufzeichnung umwandeln")
+    convert.add_argument("csv")
+    convert.add_argument("out")
+    convert.add_argument("--symbol", default="TSLA")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        recording = Recording.load(args.path)
+        span = (recording.messages[-1][0] - recording.messages[0][0]) / 1e9 if recording.messages else 0
+        symbols = sorted({msg.get("S") for _, msg in recording.messages})
+        print(f"{len(recording.messages)} Stream-Nachrichten über {span:.1f} s, Symbole: {', '.join(symbols)}")
+        for method, results in sorted(recording.rest.items()):
+            print(f"  REST {method}: {len(results)} Antwort(en)")
+    else:
+        n = convert_trades(args.csv, args.out, args.symbol)
+        print(f"{n} Trades → {args.out}")
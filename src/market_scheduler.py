@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple
+
+import pytz
+
+from helper.config import get_trading_client
+from helper.log_utils import get_logger
+from helper.utils import convert_to_german_time
+
+MARKET_TZ = pytz.timezone("America/New_York")
+CALENDAR_CACHE_FILE = os.getenv("CALENDAR_CACHE_FILE", "market_calendar.json")
+# Warm-up (Bars, Modell, News) N Minuten vor der Eröffnung; Handelsende N Minuten vor Schluss
+WARMUP_MINUTES = float(os.getenv("WARMUP_MINUTES", "15"))
+CLOSE_BUFFER_MINUTES = float(os.getenv("CLOSE_BUFFER_MINUTES", "1"))
+
+log = get_logger("scheduler")
+
+
+class MarketSession(NamedTuple):
+    """Ein Handelstag; open/close als zeitzonenbewusste UTC-Zeitpunkte."""
+    date: date
+    open: datetime
+    close: datetime
+
+
+def _utc(naive_market_time):
+    # Alpaca liefert Kalenderzeiten ohne Zeitzone in New Yorker Ortszeit
+    return MARKET_TZ.localize(naive_market_time).astimezone(timezone.utc)
+
+
+class MarketCalendar:
+    """
+    Alpaca-Handelskalender mit lokalem JSON-Cache: höchstens ein REST-Aufruf pro Tag,
+    nach einem Neustart am selben Tag gar keiner.
+    """
+
+    def __init__(self, client=None, path=CALENDAR_CACHE_FILE, days=14):
+        self.client = client
+        self.path = path
+        self.days = days
+        self.fetched = None
+        self.sessions = []
+        self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.fetched = date.fromisoformat(data["fetched"])
+            self.sessions = [MarketSession(date.fromisoformat(d), datetime.fromisoformat(o), datetime.fromisoformat(c))
+                             for d, o, c in data["sessions"]]
+        except (OSError, ValueError, KeyError):
+            self.fetched, self.sessions = None, []
+
+    def _save_cache(self):
+        data = {
+            "fetched": self.fetched.isoformat(),
+            "sessions": [[s.date.isoformat(), s.open.isoformat(), s.close.isoformat()] for s in self.sessions],
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def refresh(self, today):
+        from alpaca.trading.requests import GetCalendarRequest
+
+        client = self.client or get_trading_client()
+        calendar = client.get_calendar(GetCalendarRequest(start=today, end=today + timedelta(days=self.days)))
+        self.sessions = [MarketSession(c.date, _utc(c.open), _utc(c.close)) for c in calendar]
+        self.fetched = today
+        self._save_cache()
+        log.info("[CALENDAR] %d Handelstage ab %s geladen.", len(self.sessions), today)
+
+    def next_session(self, now=None):
+        """Laufende oder nächste Sitzung (close > now); lädt den Kalender einmal pro Tag neu."""
+        now = now or datetime.now(timezone.utc)
+        today = now.astimezone(MARKET_TZ).date()
+        if self.fetched != today:
+            try:
+                self.refresh(today)
+            except Exception as e:
+                # mit dem (älteren) Cache weiterarbeiten, solange er noch Sitzungen enthält
+                log.error("[CALENDAR] Kalender konnte nicht geladen werden: %s", e)
+        for session in self.sessions:
+            if session.close > now:
+                return session
+        return None
+
+
+class MarketScheduler:
+    """
+    Ersetzt das minütliche get_clock-Polling: pro Handelstag drei Timer auf dem Loop –
+    Warm-up (`warmup` vor Eröffnung), Eröffnung und Handelsende (`close_buffer` vor Schluss).
+    Startet der Bot während einer Sitzung, laufen Warm-up und Eröffnung sofort.
+    Dazwischen schläft der Task; lange Wartezeiten werden in Etappen gegen die Uhr nachgeprüft.
+    Schlägt ein Callback fehl, wird er geloggt und alle `callback_retry` Sekunden wiederholt
+    (Warm-up bis zur Eröffnung, Eröffnung bis zum Handelsende); der Scheduler selbst läuft weiter.
+    """
+
+    def __init__(self, on_warmup, on_open, on_close, calendar=None,
+                 warmup=timedelta(minutes=WARMUP_MINUTES), close_buffer=timedelta(minutes=CLOSE_BUFFER_MINUTES),
+                 max_sleep=3600, retry_interval=900, callback_retry=30):
+        self.on_warmup = on_warmup
+        self.on_open = on_open
+        self.on_close = on_close
+        self.calendar = calendar or MarketCalendar()
+        self.warmup = warmup
+        self.close_buffer = close_buffer
+        self.max_sleep = max_sleep
+        self.retry_interval = retry_interval
+        self.callback_retry = callback_retry
+        self.session = None
+        self.stop_event = None
+
+    async def run(self):
+        self.stop_event = asyncio.Event()
+        while not self.stop_event.is_set():
+            loop = asyncio.get_running_loop()
+            session = await loop.run_in_executor(None, self.calendar.next_session)
+            if session is None:
+                log.error("[SCHEDULER] Kein Handelstag bekannt – neuer Versuch in %d s.", self.retry_interval)
+                await self._sleep(self.retry_interval)
+                continue
+
+            end = session.close - self.close_buffer
+            if datetime.now(timezone.utc) >= end:
+                # Handelsende schon vorbei (letzte Minuten der Sitzung) → nächster Tag
+                await self._sleep_until(session.close)
+                continue
+
+            self.session = session
+            if datetime.now(timezone.utc) < session.open - self.warmup:
+                log.info("🕒 [MARKET] The market is currently closed and will reopen at %s",
+                         convert_to_german_time(session.open, session.close))
+            if not await self._sleep_until(session.open - self.warmup):
+                return
+            await self._call("Warm-up", self.on_warmup, session, until=session.open)
+            if not await self._sleep_until(session.open):
+                return
+            await self._call("Eröffnung", self.on_open, session, until=end)
+            if not await self._sleep_until(end):
+                return
+            await self._call("Handelsende", self.on_close, session)
+            self.session = None
+
+    async def _call(self, name, callback, session, until=None):
+        """Führt einen Callback aus; bei Fehlern Log und Wiederholung, solange `until` nicht erreicht ist."""
+        while True:
+            try:
+                await callback(session)
+                return True
+            except Exception as e:
+                log.exception("[SCHEDULER] %s für %s fehlgeschlagen: %s", name, session.date, e)
+            retry_at = datetime.now(timezone.utc) + timedelta(seconds=self.callback_retry)
+            if until is None or retry_at >= until or not await self._sleep(self.callback_retry):
+                return False
+
+    async def _sleep(self, seconds):
+        """Wartet bis zu `seconds`; gibt False zurück, wenn währenddessen gestoppt wurde."""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=max(seconds, 0))
+            return False
+        except asyncio.TimeoutError:
+            return True
+
+    async def _sleep_until(self, when):
+        # in Etappen, damit Uhr-Sprünge (Suspend, NTP) die Timer nicht verschieben
+        while True:
+            remaining = (when - datetime.now(timezone.utc)).total_seconds()
+            if remaining <= 0:
+                return not self.stop_event.is_set()
+            if not await self._sleep(min(remaining, self.max_sleep)):
+                return False
+
+    def stop(self):
+        if self.stop_event is not None:
+            self.stop_event.set()
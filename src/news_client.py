@@ -0,0 +1,191 @@
+import asyncio
+import os
+import random
+import time
+
+from helper.config import NEWSAPI_KEY
+
+NEWSAPI_URL = os.getenv("NEWSAPI_URL", "https://newsapi.org/v2")
+# Requests pro 24 h laut NewsAPI-Plan (Developer: 100); gilt für alle Symbole zusammen, inkl. Retries
+NEWSAPI_DAILY_BUDGET = float(os.getenv("NEWSAPI_DAILY_BUDGET", "100"))
+# so viele Requests dürfen angespart werden (nachts/ruhige Phasen → schnelleres Polling zur Handelszeit)
+NEWSAPI_BURST = float(os.getenv("NEWSAPI_BURST", NEWSAPI_DAILY_BUDGET / 2))
+# NewsAPI begrenzt q auf 500 Zeichen → längere OR-Verknüpfungen werden aufgeteilt
+MAX_QUERY_LENGTH = 500
+MAX_PAGE_SIZE = 100
+
+
+class RequestBudget:
+    """
+    Token-Bucket: im Mittel höchstens `per_day` Requests pro Tag. Nicht genutzte Tokens werden bis
+    `burst` angespart, sodass nach ruhigen Phasen schneller als im Tagesmittel gepollt werden kann.
+    """
+
+    def __init__(self, per_day=NEWSAPI_DAILY_BUDGET, burst=NEWSAPI_BURST):
+        self.rate = per_day / 86400
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+
+    @property
+    def interval(self):
+        """Mittlerer Abstand zwischen zwei Requests in Sekunden."""
+        return 1 / self.rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def wait_time(self, requests=1):
+        """Sekunden, bis `requests` Tokens verfügbar sind (0, solange angesparte Tokens reichen)."""
+        return max(0.0, (min(requests, self.capacity) - self._refill()) / self.rate)
+
+    async def acquire(self):
+        while True:
+            if self._refill() >= 1:
+                self.tokens -= 1
+                return
+            delay = (1 - self.tokens) / self.rate
+            self.waited += delay
+            await asyncio.sleep(delay)
+
+
+class NewsClient:
+    """
+    Asynchroner NewsAPI-Client mit gepoolter Session, Timeouts und Backoff.
+    Alle Queries eines Polls gehen als OR-Verknüpfung in einen Request (aufgeteilt nur bei mehr
+    als 500 Zeichen); die Artikel werden den Queries über Titel/Beschreibung zugeordnet. Jeder
+    Request (auch Retries) verbraucht ein Token aus dem Tagesbudget (`daily_budget`, bis
+    `burst` Tokens ansparbar).
+    Je Request wird das `publishedAt` des neuesten Artikels gemerkt und als `from=` mitgeschickt,
+    sodass nur neuere Artikel zurückkommen.
+    `base_url` lässt sich für Tests auf einen lokalen Mock-Server umbiegen.
+    """
+
+    def __init__(self, api_key=NEWSAPI_KEY, base_url=NEWSAPI_URL, page_size=10,
+                 concurrency=4, timeout=10, max_retries=3, daily_budget=NEWSAPI_DAILY_BUDGET,
+                 burst=NEWSAPI_BURST):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.page_size = page_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+        self.watermarks = {}  # query -> publishedAt des neuesten Artikels
+        self.seen = {}        # query -> URLs mit publishedAt == Watermark (from= ist inklusiv)
+        self.budget = RequestBudget(daily_budget, burst)
+        self.requests = 0
+        self.retries = 0
+
+    async def _get_session(self):
+        # aiohttp erst beim ersten Request importieren (~0,3 s, verzögert sonst den Bot-Start)
+        import aiohttp
+
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"X-Api-Key": self.api_key or ""},
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+            )
+        return self.session
+
+    async def _get_json(self, path, params):
+        import aiohttp
+
+        session = await self._get_session()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.budget.acquire()
+                self.requests += 1
+                async with session.get(f"{self.base_url}/{path}", params=params) as response:
+                    if response.status == 429 or response.status >= 500:
+                        retry_after = response.headers.get("Retry-After")
+                        raise _Retryable(float(retry_after) if retry_after else None)
+                    response.raise_for_status()
+                    return await response.json()
+            except (_Retryable, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                delay = getattr(e, "retry_after", None) or min(2 ** attempt, 30) * (0.5 + random.random())
+                await asyncio.sleep(delay)
+
+    async def fetch(self, query, page_size=None):
+        """Gibt die seit dem letzten Aufruf neuen Artikel für `query` zurück (neueste zuerst)."""
+        params = {"q": query, "sortBy": "publishedAt", "language": "en", "pageSize": page_size or self.page_size}
+        watermark = self.watermarks.get(query)
+        if watermark:
+            params["from"] = watermark
+
+        async with self.semaphore:
+            data = await self._get_json("everything", params)
+
+        seen = self.seen.get(query, set())
+        articles = [
+            a for a in data.get("articles", [])
+            if not watermark or (a.get("publishedAt", "") > watermark
+                                 or (a.get("publishedAt") == watermark and a.get("url") not in seen))
+        ]
+        if articles:
+            newest = max(a.get("publishedAt", "") for a in articles)
+            if newest != watermark:
+                seen = set()
+            self.watermarks[query] = newest
+            self.seen[query] = seen | {a.get("url") for a in articles if a.get("publishedAt") == newest}
+        return articles
+
+    @staticmethod
+    def batch_queries(queries):
+        """Teilt Queries in OR-Gruppen mit höchstens MAX_QUERY_LENGTH Zeichen auf."""
+        groups, current = [], []
+        for query in dict.fromkeys(queries):
+            candidate = current + [query]
+            if current and len(" OR ".join(f'"{q}"' for q in candidate)) > MAX_QUERY_LENGTH:
+                groups.append(current)
+                candidate = [query]
+            current = candidate
+        if current:
+            groups.append(current)
+        return groups
+
+    def budget_delay(self, queries):
+        """Sekunden, bis das Tagesbudget einen Poll dieser Queries (ein Request je OR-Gruppe) erlaubt."""
+        return self.budget.wait_time(len(self.batch_queries(queries)))
+
+    async def fetch_all(self, queries):
+        """
+        Fragt alle Queries mit möglichst wenigen Requests ab (OR-Gruppen, parallel).
+        Gibt je Query die neuen Artikel zurück; scheitert eine Gruppe, steht bei ihren Queries die Exception.
+        """
+        groups = self.batch_queries(queries)
+        results = await asyncio.gather(
+            *(self.fetch(" OR ".join(f'"{q}"' for q in group), min(MAX_PAGE_SIZE, self.page_size * len(group)))
+              for group in groups),
+            return_exceptions=True)
+
+        by_query = {}
+        for group, result in zip(groups, results):
+            for query in group:
+                if isinstance(result, Exception) or len(group) == 1:
+                    by_query[query] = result
+                    continue
+                needle = query.lower()
+                by_query[query] = [a for a in result
+                                   if needle in f"{a.get('title') or ''} {a.get('description') or ''}".lower()]
+        return by_query
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class _Retryable(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__(f"Retry nach {retry_after} s" if retry_after else "Retry")
+        self.retry_after = retry_after
@@ -1,31 +1,157 @@
+import asyncio
+import os
 import threading
-import time
+from collections import deque
 from datetime import datetime
+from typing import NamedTuple, Optional
 
-from helper.finbert_utils import estimate_sentiment
+from helper.finbert_utils import aggregate_sentiment, get_backend, score_headlines
+from helper.log_utils import get_logger
+from helper.sentiment_cache import SentimentCache
+from latency import incr, timed, timer
+from news_client import NewsClient
+from sentiment_service import ensure_service
 
+SENTIMENT_CACHE_FILE = os.getenv("SENTIMENT_CACHE_FILE", "sentiment_cache.json")
 
-class NewsWatcher(threading.Thread):
-    def __init__(self, trader, interval=300):  # 5 Minuten
-        super().__init__()
-        self.trader = trader
+
+class SentimentSnapshot(NamedTuple):
+    """Unveränderlicher Sentiment-Stand eines Symbols; wird als Ganzes ersetzt, nie verändert."""
+    probability: float
+    sentiment: str
+    updated_at: Optional[datetime] = None
+
+
+NEUTRAL_SENTIMENT = SentimentSnapshot(0.5, "neutral")
+
+log = get_logger("news")
+
+
+class NewsWatcher:
+    """
+    Pollt News als asyncio-Task auf dem Loop des Bots. Das Intervall verkürzt sich nach
+    frischen News (min_interval) und während der Handelszeit (market_interval) und wächst
+    danach schrittweise wieder auf `interval`. Schneller als das Tagesmittel des NewsAPI-Budgets
+    geht es nur, solange angesparte Tokens reichen (NEWSAPI_DAILY_BUDGET/NEWSAPI_BURST); ist der
+    Bucket leer, wartet der nächste Poll, bis wieder ein Token je Request da ist.
+    Neue Sentiments werden als SentimentSnapshot an trader.cached_sentiment gehängt.
+    """
+
+    def __init__(self, traders, interval=300, min_interval=30, market_interval=120):  # 5 Minuten
+        # ein Watcher (und damit ein FinBERT-Modell) für alle Symbole
+        self.traders = traders if isinstance(traders, (list, tuple)) else [traders]
         self.interval = interval
-        self.running = True
-        self.last_headlines = set()
+        self.min_interval = min_interval
+        self.market_interval = market_interval
+        self.current_interval = interval
+        self.market_open = False
+        self.task = None
+        self.stop_event = None
+        # NewsClient liefert je Query nur neue Artikel; das Sentiment wird über die letzten N Headlines gebildet
+        self.news_client = NewsClient()
+        self.recent_headlines = {t.symbol: deque(maxlen=self.news_client.page_size) for t in self.traders}
+        # FinBERT läuft nur noch für Headlines, die noch nicht im Cache sind
+        self.sentiment_cache = SentimentCache(path=SENTIMENT_CACHE_FILE)
+        # FinBERT läuft im SentimentService-Prozess, der Watcher ist nur noch Client
+        self.sentiment_client = None
+
+    def start(self):
+        """Startet den Watcher als Task auf dem laufenden Event-Loop."""
+        self.stop_event = asyncio.Event()
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    def score(self, headlines):
+        if self.sentiment_client is None:
+            return score_headlines(headlines)
+        try:
+            return self.sentiment_client.score(headlines)
+        except (OSError, EOFError, TimeoutError):
+            # Dienst weg (z. B. abgestürzt) → beim nächsten Aufruf neu verbinden bzw. starten
+            self.sentiment_client = ensure_service()
+            raise
 
-    def run(self):
-        while self.running:
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            self.sentiment_client = await loop.run_in_executor(None, ensure_service)
+        except Exception as e:
+            log.warning("Sentiment-Dienst nicht verfügbar, FinBERT läuft lokal: %s", e)
+        if self.sentiment_client is None:
+            self.warm_up()
+
+        try:
+            while not self.stop_event.is_set():
+                fresh = await self.poll()
+                self.current_interval = self.next_interval(fresh)
+                try:
+                    await asyncio.wait_for(self.stop_event.wait(), timeout=self.current_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.news_client.close()
+            self.sentiment_cache.save()
+
+    def warm_up(self):
+        """
+        Lädt das lokale FinBERT-Modell vorab, statt beim ersten News-Treffer. Daemon-Thread statt
+        Executor: ein noch ladendes Modell hält weder den Loop noch das Beenden des Bots auf.
+        """
+        def load():
             try:
-                headlines = set(self.trader.get_newsapi_headlines("Tesla"))
-                if headlines != self.last_headlines:
-                    print(f"[🔔] Neue News erkannt!")
-                    prob, sentiment = estimate_sentiment(list(headlines))
-                    self.trader.cached_sentiment = (prob.item(), sentiment)
-                    self.trader.last_news_update = datetime.utcnow()
-                    self.last_headlines = headlines
+                with timer("news.warmup"):
+                    get_backend()
             except Exception as e:
-                print(f"[ERROR] NewsWatcher: {e}")
-            time.sleep(self.interval)
+                log.warning("FinBERT konnte nicht vorab geladen werden: %s", e)
+
+        threading.Thread(target=load, name="finbert-warmup", daemon=True).start()
+
+    @timed("news.poll")
+    async def poll(self):
+        """Fragt alle Queries ab und gibt zurück, ob es für mindestens ein Symbol neue News gab."""
+        articles = await self.news_client.fetch_all(t.news_query for t in self.traders)
+        fresh = False
+        for trader in self.traders:
+            try:
+                result = articles[trader.news_query]
+                if isinstance(result, Exception):
+                    raise result
+                fresh |= await self.update_sentiment(trader, [a["title"] for a in result if a.get("title")])
+            except Exception as e:
+                log.error("NewsWatcher (%s): %s", trader.symbol, e)
+        await asyncio.get_running_loop().run_in_executor(None, self.sentiment_cache.save)
+        return fresh
+
+    def next_interval(self, fresh):
+        if fresh:
+            interval = self.min_interval
+        else:
+            ceiling = min(self.interval, self.market_interval) if self.market_open else self.interval
+            interval = min(self.current_interval * 2, ceiling)
+        return max(interval, self.news_client.budget_delay(t.news_query for t in self.traders))
+
+    async def update_sentiment(self, trader, new_titles):
+        recent = self.recent_headlines[trader.symbol]
+        new_titles = [title for title in new_titles if title not in recent]
+        if not new_titles:
+            return False
+
+        log.info("[🔔] Neue News erkannt für %s!", trader.symbol)
+        recent.extendleft(reversed(new_titles))
+        # Scoring (Cache + Sentiment-Dienst) blockiert → im Executor, der Loop bleibt frei
+        with timer("news.score"):
+            probs = await asyncio.get_running_loop().run_in_executor(
+                None, self.sentiment_cache.score, list(recent), self.score)
+        incr("news_updates")
+        probability, sentiment = aggregate_sentiment(probs)
+        now = datetime.utcnow()
+        trader.cached_sentiment = SentimentSnapshot(probability, sentiment, now)
+        trader.last_news_update = now
+        return True
 
     def stop(self):
-        self.running = False
+        """Beendet den Watcher sofort (kein Warten auf das laufende Intervall)."""
+        if self.stop_event is not None:
+            self.stop_event.set()
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+
+import requests
+from alpaca.common.exceptions import APIError
+from alpaca.trading.enums import QueryOrderStatus
+from alpaca.trading.requests import GetOrdersRequest
+
+from helper.log_utils import get_logger
+from latency import incr
+from trading_bot import ORDER_SIDES
+
+# Aktionen, die eine Position eröffnen (→ Bracket) bzw. schließen (→ offene Bracket-Legs vorher stornieren)
+OPENING_ACTIONS = ("BUY", "SELL-OPEN")
+CLOSING_ACTIONS = ("SELL-CLOSE", "BUY-CLOSE")
+FINAL_EVENTS = ("fill", "canceled", "expired", "rejected", "done_for_day")
+
+log = get_logger("orders")
+
+
+@dataclass
+class InflightOrder:
+    client_order_id: str
+    symbol: str
+    action: str
+    qty: int
+    submitted_at: float
+    order_id: str = None
+
+
+class OrderManager:
+    """
+    Zentrale Order-Abgabe für den Live-Bot:
+    - Eröffnungen als Bracket-Order (Stop/Ziel aus calculate_risk_levels, wenn params.use_brackets),
+    - deterministische client_order_id je Signal → Retries erzeugen keine Doppel-Orders,
+    - je Symbol höchstens eine Order in flight, bis ein Trade-Update sie abschließt
+      (oder `inflight_timeout` ohne Update verstreicht; gemessen mit `clock`, im Replay also
+      in Aufzeichnungszeit),
+    - vor dem Schließen werden offene Bracket-Legs storniert und die Bestätigung abgewartet
+      (Alpaca storniert asynchron; solange die Legs offen sind, blockieren sie die Stücke und
+      die Close-Order würde mit "insufficient qty" abgelehnt).
+    """
+
+    def __init__(self, broker, prefix="mi", retries=3, inflight_timeout=120, cancel_timeout=10,
+                 cancel_poll=0.25, clock=None):
+        self.broker = broker
+        self.clock = clock or time.monotonic
+        self.prefix = prefix
+        self.retries = retries
+        self.inflight_timeout = inflight_timeout
+        self.cancel_timeout = cancel_timeout
+        self.cancel_poll = cancel_poll
+        self.inflight = {}  # symbol -> InflightOrder
+
+    def client_order_id(self, symbol, action, qty, signal_time):
+        """Gleiches Signal (Symbol, Aktion, Menge, auslösender Tick) → gleiche ID."""
+        key = f"{symbol}|{action}|{int(qty)}|{signal_time}"
+        return f"{self.prefix}-{symbol}-{action}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+    def has_inflight(self, symbol):
+        order = self.inflight.get(symbol)
+        if order is None:
+            return False
+        if self.clock() - order.submitted_at > self.inflight_timeout:
+            log.warning("[ORDER] Kein Update für %s nach %ds – gebe Symbol wieder frei.",
+                        order.client_order_id, self.inflight_timeout)
+            self.inflight.pop(symbol, None)
+            return False
+        return True
+
+    def build_order(self, trader, action, qty, price, client_order_id):
+        side = ORDER_SIDES[action]
+        if action in OPENING_ACTIONS and trader.params.use_brackets:
+            stop_loss, take_profit = trader.calculate_risk_levels(price, side=side)
+            return trader.create_order(trader.symbol, qty, side, client_order_id, stop_loss, take_profit)
+        return trader.create_order(trader.symbol, qty, side, client_order_id)
+
+    def cancel_open_orders(self, client, symbol):
+        """
+        Storniert offene Orders (z. B. Stop-/Take-Profit-Legs) des Symbols und wartet, bis Alpaca
+        keine offene Order mehr meldet; läuft im Broker-Pool. TimeoutError nach `cancel_timeout`.
+        """
+        # nicht verschachtelt abfragen: offene Legs kommen dann als eigene Orders zurück
+        request = GetOrdersRequest(status=QueryOrderStatus.OPEN, symbols=[symbol])
+        cancelled = 0
+        for order in client.get_orders(request):
+            client.cancel_order_by_id(order.id)
+            cancelled += 1
+        if not cancelled:
+            return 0
+
+        deadline = time.monotonic() + self.cancel_timeout
+        while client.get_orders(request):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Stornierung für {symbol} nach {self.cancel_timeout}s nicht bestätigt")
+            time.sleep(self.cancel_poll)
+        log.info("[ORDER] %d offene Order(s) für %s storniert.", cancelled, symbol)
+        return cancelled
+
+    async def submit(self, trader, action, qty, price, signal_time):
+        """Gibt die Broker-Antwort zurück oder None, wenn für das Symbol schon eine Order läuft."""
+        symbol = trader.symbol
+        if self.has_inflight(symbol):
+            incr("orders_suppressed")
+            log.debug("[ORDER] %s: Order noch in flight – kein neues Signal.", symbol)
+            return None
+
+        client_order_id = self.client_order_id(symbol, action, qty, signal_time)
+        self.inflight[symbol] = InflightOrder(client_order_id, symbol, action, int(qty), self.clock())
+
+        if action in CLOSING_ACTIONS:
+            try:
+                await self.broker.run(self.cancel_open_orders, trader.client, symbol)
+            except Exception as e:
+                # Legs halten die Stücke noch → Close würde abgelehnt; beim nächsten Signal erneut versuchen
+                log.warning("[ORDER] Offene Orders für %s konnten nicht storniert werden: %s", symbol, e)
+                incr("orders_cancel_failed")
+                self.inflight.pop(symbol, None)
+                return None
+
+        order = self.build_order(trader, action, qty, price, client_order_id)
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.broker.submit_order(trader, order)
+                if getattr(response, "status", None) == "filled":
+                    self.inflight.pop(symbol, None)  # sofort gefüllt (z. B. Replay) → nichts mehr offen
+                else:
+                    self.inflight[symbol].order_id = str(getattr(response, "id", "") or "")
+                return response
+            except APIError as e:
+                if e.status_code == 422 and "client_order_id" in str(e):
+                    # vorheriger Versuch ist doch angekommen → vorhandene Order übernehmen
+                    log.info("[ORDER] %s existiert bereits – übernehme vorhandene Order.", client_order_id)
+                    return await self.broker.run(trader.client.get_order_by_client_id, client_order_id)
+                if e.status_code is None or e.status_code < 500 or attempt == self.retries:
+                    self.inflight.pop(symbol, None)
+                    raise
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    self.inflight.pop(symbol, None)
+                    raise
+            incr("order_retries")
+            await asyncio.sleep(min(0.5 * 2 ** attempt, 5))
+
+    async def on_trade_update(self, data):
+        """Gibt das Symbol frei, sobald die eigene Order final ist (fill/cancel/reject/...)."""
+        order = data.order
+        event = getattr(data.event, "value", data.event)
+        inflight = self.inflight.get(order.symbol)
+        if inflight and inflight.client_order_id == order.client_order_id and event in FINAL_EVENTS:
+            self.inflight.pop(order.symbol, None)
+            if event != "fill":
+                log.warning("[ORDER] %s %s: %s", order.symbol, inflight.action, event)
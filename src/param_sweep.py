@@ -0,0 +1,133 @@
+import argparse
+import itertools
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backtester import BAR_FIELDS, Backtester, add_data_arguments, bar_arrays, load_data_arguments
+from trading_bot import StrategyParams
+
+
+DEFAULT_GRID = {
+    "buy_threshold": [1.5, 2, 2.5],
+    "sell_threshold": [-1.5, -2, -2.5],
+    "candle_weight": [1, 2],
+    "ma_period": [10, 20, 50],
+    "order_cooldown": [30, 300],
+}
+
+# Sentiment je Bar als int8-Code (Index in SENTIMENT_LABELS); alles außer positiv/negativ zählt neutral
+SENTIMENT_LABELS = np.array(["neutral", "positive", "negative"], dtype=object)
+
+# wird im Worker-Prozess einmalig per Memory-Map geladen (siehe _init_worker)
+_SHARED_BARS = {}
+
+
+def build_grid(grid):
+    """Kartesisches Produkt der Parameterlisten → Liste von StrategyParams."""
+    valid = {f.name for f in fields(StrategyParams)}
+    unknown = set(grid) - valid
+    if unknown:
+        raise ValueError(f"Unbekannte Parameter: {', '.join(sorted(unknown))}")
+    keys = list(grid)
+    return [StrategyParams(**dict(zip(keys, values))) for values in itertools.product(*grid.values())]
+
+
+def share_bars(bars_by_symbol, directory):
+    """
+    Schreibt die Bar-Arrays einmalig als .npy-Dateien. Die Worker öffnen sie per
+    Memory-Map, so teilen sich alle Prozesse dieselben Seiten im Page-Cache statt
+    die Daten pro Task zu picklen.
+    """
+    directory = Path(directory)
+    for symbol, bars in bars_by_symbol.items():
+        arrays = bar_arrays(bars)
+        np.save(directory / f"{symbol}.timestamp.npy", arrays["timestamp"].astype("datetime64[ns]").view(np.int64))
+        for field in BAR_FIELDS:
+            np.save(directory / f"{symbol}.{field}.npy", np.ascontiguousarray(arrays[field], dtype=np.float64))
+        if "sentiment" in arrays:
+            sentiment = arrays["sentiment"]
+            codes = np.where(sentiment == "positive", 1, np.where(sentiment == "negative", 2, 0)).astype(np.int8)
+            np.save(directory / f"{symbol}.sentiment.npy", codes)
+    return directory
+
+
+def _init_worker(directory, symbols):
+    directory = Path(directory)
+    for symbol in symbols:
+        arrays = {"timestamp": np.load(directory / f"{symbol}.timestamp.npy", mmap_mode="r").view("datetime64[ns]")}
+        for field in BAR_FIELDS:
+            arrays[field] = np.load(directory / f"{symbol}.{field}.npy", mmap_mode="r")
+        sentiment = directory / f"{symbol}.sentiment.npy"
+        if sentiment.exists():
+            arrays["sentiment"] = SENTIMENT_LABELS[np.load(sentiment)]
+        _SHARED_BARS[symbol] = arrays
+
+
+def _run_config(params, cash, slippage_bps):
+    summaries = []
+    for symbol, bars in _SHARED_BARS.items():
+        result = Backtester(symbol, cash=cash, params=params, slippage_bps=slippage_bps).run(bars)
+        summaries.append(result.summary())
+    return params, summaries
+
+
+def rank_results(results, metric="return_pct"):
+    """Aggregiert die Ergebnisse je Parameter-Kombination über alle Symbole und sortiert absteigend."""
+    rows = []
+    for params, summaries in results:
+        per_symbol = pd.DataFrame(summaries)
+        rows.append({
+            **asdict(params),
+            "return_pct": per_symbol["return_pct"].mean(),
+            "realized_pnl": per_symbol["realized_pnl"].sum(),
+            "orders": per_symbol["orders"].sum(),
+            "win_rate": per_symbol["win_rate"].mean(),
+            "max_drawdown_pct": per_symbol["max_drawdown_pct"].max(),
+        })
+    return pd.DataFrame(rows).sort_values(metric, ascending=False).reset_index(drop=True)
+
+
+def run_sweep(bars_by_symbol, grid=None, workers=None, cash=100_000.0, slippage_bps=0.0, metric="return_pct"):
+    configs = build_grid(grid or DEFAULT_GRID)
+    workers = workers or os.cpu_count()
+    print(f"[SWEEP] {len(configs)} Konfigurationen × {len(bars_by_symbol)} Symbol(e) auf {workers} Prozessen")
+
+    with tempfile.TemporaryDirectory(prefix="mi_trade_sweep_") as directory:
+        share_bars(bars_by_symbol, directory)
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(directory, list(bars_by_symbol))) as pool:
+            futures = [pool.submit(_run_config, params, cash, slippage_bps) for params in configs]
+            for done, future in enumerate(as_completed(futures), 1):
+                results.append(future.result())
+                if done % max(1, len(futures) // 10) == 0:
+                    print(f"[SWEEP] {done}/{len(futures)} fertig")
+
+    return rank_results(results, metric)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paralleler Parameter-Sweep über den Backtester")
+    add_data_arguments(parser)
+    parser.add_argument("--grid", help='JSON, z. B. \'{"buy_threshold": [1.5, 2], "ma_period": [10, 20]}\'')
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cash", type=float, default=100_000.0)
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--metric", default="return_pct")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="vollständiges Ranking als CSV speichern")
+    args = parser.parse_args()
+
+    bars_by_symbol = load_data_arguments(args)
+    report = run_sweep(bars_by_symbol, json.loads(args.grid) if args.grid else None,
+                       args.workers, args.cash, args.slippage_bps, args.metric)
+    print(report.head(args.top).to_string())
+    if args.out:
+        report.to_csv(args.out, index=False)
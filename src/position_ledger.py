@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from datetime import datetime
+
+from helper.log_utils import get_logger
+
+FILL_EVENTS = ("fill", "partial_fill")
+
+log = get_logger("ledger")
+
+
+class LedgerPosition:
+    """Schlanke Position mit denselben Feldern, die der Bot von Alpacas Position nutzt."""
+    __slots__ = ("symbol", "qty", "avg_entry_price")
+
+    def __init__(self, symbol, qty, avg_entry_price):
+        self.symbol = symbol
+        self.qty = qty
+        self.avg_entry_price = avg_entry_price
+
+
+class PositionLedger:
+    """
+    Lokal geführter Stand von Positionen und Cash.
+    Wird einmal beim Start per REST geladen, danach über den Trade-Updates-Stream
+    (Fills) fortgeschrieben und nur in langen Abständen oder bei Abweichungen
+    wieder mit REST abgeglichen.
+    """
+
+    def __init__(self, client, reconcile_interval=300, drift_tolerance=1e-6):
+        self.client = client
+        self.reconcile_interval = reconcile_interval
+        self.drift_tolerance = drift_tolerance
+        self.positions = {}
+        self.cash = 0.0
+        self.last_reconcile = None
+        self.drift_detected = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Lädt Positionen und Cash per REST und ersetzt den lokalen Stand atomar."""
+        positions = self.client.get_all_positions()
+        cash = float(self.client.get_account().cash)
+        snapshot = {
+            p.symbol: LedgerPosition(p.symbol, float(p.qty), float(p.avg_entry_price))
+            for p in positions
+        }
+        with self._lock:
+            self.positions = snapshot
+            self.cash = cash
+            self.last_reconcile = datetime.utcnow()
+            self.drift_detected = False
+        return list(snapshot.values())
+
+    def get_position(self, symbol):
+        return self.positions.get(symbol)
+
+    def get_cash(self):
+        return self.cash
+
+    def all_positions(self):
+        return list(self.positions.values())
+
+    def apply_fill(self, symbol, side, qty, price, position_qty=None):
+        """Schreibt einen (Teil-)Fill fort. `position_qty` ist Alpacas Positionsstand nach dem Fill."""
+        signed_qty = qty if side == "buy" else -qty
+        with self._lock:
+            current = self.positions.get(symbol)
+            old_qty = current.qty if current else 0.0
+            new_qty = old_qty + signed_qty
+
+            if abs(new_qty) < self.drift_tolerance:
+                self.positions.pop(symbol, None)
+            elif current is None or old_qty * new_qty < 0:
+                self.positions[symbol] = LedgerPosition(symbol, new_qty, price)
+            elif abs(new_qty) > abs(old_qty):
+                # Position ausgebaut → Einstandspreis gewichtet mitteln
+                avg = (abs(old_qty) * current.avg_entry_price + qty * price) / abs(new_qty)
+                self.positions[symbol] = LedgerPosition(symbol, new_qty, avg)
+            else:
+                self.positions[symbol] = LedgerPosition(symbol, new_qty, current.avg_entry_price)
+
+            self.cash -= signed_qty * price
+
+            if position_qty is not None and abs(float(position_qty) - new_qty) > self.drift_tolerance:
+                log.warning("[LEDGER] Abweichung bei %s: lokal %s, Broker %s", symbol, new_qty, position_qty)
+                self.drift_detected = True
+
+    async def on_trade_update(self, data):
+        """Handler für TradingStream.subscribe_trade_updates."""
+        event = str(getattr(data.event, "value", data.event))
+        if event not in FILL_EVENTS or data.qty is None or data.price is None:
+            return
+
+        order = data.order
+        side = str(getattr(order.side, "value", order.side))
+        self.apply_fill(order.symbol, side, float(data.qty), float(data.price), data.position_qty)
+        log.info("[LEDGER] %s %s %s %s @ %s", event.upper(), side, data.qty, order.symbol, data.price)
+
+        if self.drift_detected:
+            await self.reconcile()
+
+    async def reconcile(self):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.load)
+            log.info("[LEDGER] Abgleich mit Alpaca: %d Position(en), Cash %.2f", len(self.positions), self.cash)
+        except Exception as e:
+            log.error("Ledger-Abgleich fehlgeschlagen: %s", e)
+
+    async def run_reconciler(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            await self.reconcile()
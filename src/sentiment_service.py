@@ -0,0 +1,241 @@
+import atexit
+import itertools
+import os
+import queue
+import secrets
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from helper.log_utils import get_logger
+
+# Standard: <XDG_RUNTIME_DIR bzw. TMP>/mi_trade-<uid>/sentiment.sock in einem privaten Verzeichnis (0700)
+SENTIMENT_SOCKET = os.getenv("SENTIMENT_SOCKET")
+# ohne Vorgabe erzeugt der startende Bot je Start einen Zufallsschlüssel (Datei <socket>.key, 0600)
+SENTIMENT_AUTHKEY = os.getenv("SENTIMENT_AUTHKEY")
+# off = FinBERT im eigenen Prozess, auto = Dienst nutzen bzw. bei Bedarf starten, external = nur verbinden
+SENTIMENT_SERVICE = os.getenv("SENTIMENT_SERVICE", "auto")
+
+log = get_logger("sentiment")
+
+
+def runtime_dir():
+    """Privates Verzeichnis für Socket und Schlüssel; verweigert fremde oder offene Verzeichnisse."""
+    path = os.path.join(os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"mi_trade-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"{path} ist kein privates Verzeichnis (Eigentümer/Rechte 0700 prüfen)")
+    return path
+
+
+def default_address():
+    return SENTIMENT_SOCKET or os.path.join(runtime_dir(), "sentiment.sock")
+
+
+def _is_private(st):
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def load_authkey(address):
+    """Schlüssel aus SENTIMENT_AUTHKEY oder der Schlüsseldatei neben dem Socket (nur eigene, 0600)."""
+    if SENTIMENT_AUTHKEY:
+        return SENTIMENT_AUTHKEY.encode()
+    try:
+        with open(f"{address}.key", "rb") as f:
+            if not _is_private(os.fstat(f.fileno())):
+                log.warning("[SENTIMENT] %s.key ist nicht privat – wird ignoriert.", address)
+                return None
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_authkey(address, authkey):
+    # mkstemp legt die Datei mit 0600 an; os.replace tauscht atomar
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(address) or ".", prefix=".sentiment.", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(authkey)
+    os.replace(tmp, f"{address}.key")
+
+
+def _remove_stale_socket(address):
+    """Löscht einen liegengebliebenen Socket – aber nur, wenn er ein eigener Socket ist."""
+    try:
+        st = os.lstat(address)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f"{address} existiert und ist kein eigener Socket – wird nicht gelöscht")
+    os.unlink(address)
+
+
+class SentimentService:
+    """
+    Lokaler FinBERT-Dienst in einem eigenen Prozess (Unix-Socket).
+    Anfragen mehrerer Bots/Symbole werden innerhalb von `window_ms` zu einem Batch
+    zusammengefasst, doppelte Headlines nur einmal bewertet und die Scores je
+    Headline an die jeweiligen Clients zurückgegeben.
+    """
+
+    def __init__(self, address=None, authkey=None, window_ms=25, max_batch=64):
+        self.address = address or default_address()
+        self.authkey = authkey or load_authkey(self.address)
+        if not self.authkey:
+            raise RuntimeError("Kein Schlüssel für den Sentiment-Dienst (SENTIMENT_AUTHKEY setzen)")
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+
+    def serve_forever(self):
+        from helper.finbert_utils import get_backend, score_headlines
+
+        get_backend()  # Modell vor der ersten Anfrage laden
+        _remove_stale_socket(self.address)
+        listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        os.chmod(self.address, 0o600)
+        log.info("[SENTIMENT] Dienst bereit auf %s", self.address)
+
+        threading.Thread(target=self._accept, args=(listener,), daemon=True).start()
+        while True:
+            batch = self._collect_batch()
+            texts = list(dict.fromkeys(text for _, _, _, texts in batch for text in texts))
+            try:
+                scores = dict(zip(texts, score_headlines(texts)))
+                error = None
+            except Exception as e:
+                scores, error = {}, str(e)
+            for conn, lock, request_id, request_texts in batch:
+                reply = (request_id, [scores.get(t) for t in request_texts], error)
+                try:
+                    with lock:
+                        conn.send(reply)
+                except (OSError, EOFError):
+                    pass
+
+    def _accept(self, listener):
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, OSError, EOFError) as e:
+                # falscher Schlüssel o. Ä.: nur diese Verbindung ablehnen, der Dienst läuft weiter
+                log.warning("[SENTIMENT] Verbindung abgelehnt: %s", e)
+                continue
+            threading.Thread(target=self._read, args=(conn, threading.Lock()), daemon=True).start()
+
+    def _read(self, conn, lock):
+        try:
+            while True:
+                request_id, texts = conn.recv()
+                self.requests.put((conn, lock, request_id, texts))
+        except (OSError, EOFError):
+            conn.close()
+
+    def _collect_batch(self):
+        """Wartet auf die erste Anfrage und sammelt dann bis zum Ende des Zeitfensters weitere."""
+        batch = [self.requests.get()]
+        size = len(batch[0][3])
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[3])
+        return batch
+
+
+class SentimentClient:
+    """Schlanker Client für den SentimentService; thread-sicher, verbindet bei Bedarf neu."""
+
+    def __init__(self, address, authkey, timeout=60):
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+        self.conn = None
+        self.lock = threading.Lock()
+        self.ids = itertools.count()
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+        return self.conn
+
+    def score(self, texts):
+        """Gibt wie finbert_utils.score_headlines je Text [positiv, negativ, neutral] zurück."""
+        with self.lock:
+            request_id = next(self.ids)
+            try:
+                conn = self.connect()
+                conn.send((request_id, list(texts)))
+                if not conn.poll(self.timeout):
+                    raise TimeoutError("Sentiment-Dienst antwortet nicht")
+                reply_id, scores, error = conn.recv()
+            except (OSError, EOFError, TimeoutError):
+                self.close()
+                raise
+        if error:
+            raise RuntimeError(f"Sentiment-Dienst: {error}")
+        return scores
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def ensure_service(address=None, timeout=120):
+    """
+    Verbindet mit einem laufenden Dienst oder startet ihn als Kindprozess.
+    Gibt den Client zurück oder None, wenn der Dienst abgeschaltet ist (SENTIMENT_SERVICE=off).
+    """
+    if SENTIMENT_SERVICE == "off":
+        return None
+
+    address = address or default_address()
+    authkey = load_authkey(address)
+    if authkey:
+        client = SentimentClient(address, authkey)
+        try:
+            client.connect()
+            return client
+        except (OSError, EOFError, AuthenticationError):
+            if SENTIMENT_SERVICE == "external":
+                raise
+    elif SENTIMENT_SERVICE == "external":
+        raise RuntimeError("Kein Schlüssel für den Sentiment-Dienst (SENTIMENT_AUTHKEY setzen)")
+
+    log.info("[SENTIMENT] Starte lokalen Sentiment-Dienst …")
+    if not SENTIMENT_AUTHKEY:
+        # neuer Zufallsschlüssel je Start; weitere Bots desselben Nutzers lesen ihn aus der Schlüsseldatei
+        authkey = secrets.token_bytes(32).hex().encode()
+        _write_authkey(address, authkey)
+    client = SentimentClient(address, authkey)
+    # eigener Interpreter statt multiprocessing-Spawn, damit das Bot-Hauptmodul nicht neu importiert wird
+    env = dict(os.environ, SENTIMENT_SOCKET=address, SENTIMENT_AUTHKEY=authkey.decode())
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env)
+    atexit.register(process.terminate)  # selbst gestarteter Dienst endet mit dem Bot
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            client.connect()
+            return client
+        except (OSError, EOFError):
+            if process.poll() is not None:
+                raise RuntimeError("Sentiment-Dienst konnte nicht gestartet werden")
+            time.sleep(0.5)
+    raise TimeoutError("Sentiment-Dienst nicht rechtzeitig bereit")
+
+
+if __name__ == "__main__":
+    SentimentService().serve_forever()
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import random
+import time
+
+from helper.log_utils import get_logger
+from latency import incr, metrics, timer
+
+# ohne Nachricht länger als N Sekunden gilt der Stream als hängend (0 = keine Stall-Erkennung)
+STREAM_STALL_TIMEOUT = float(os.getenv("STREAM_STALL_TIMEOUT", "90"))
+
+log = get_logger("stream")
+
+
+class StreamSupervisor:
+    """
+    Überwacht den StockDataStream: endet der Stream (Exception, Verbindungsabbruch) oder kommt
+    länger als `stall_timeout` keine Nachricht, wird er geschlossen und nach einem Backoff mit
+    Jitter durch einen frischen Stream aus `stream_factory` ersetzt. Vor dem Neuaufbau werden
+    die Bars der Ausfallzeit über `on_gap(symbols, gap_seconds)` nachgeladen, damit Indikatoren
+    stimmen, bevor wieder entschieden wird. Fehler im Handler beenden den Stream nicht.
+
+    Standard ist das Trade-Abo; mit `subscribe(stream, handler)` lässt sich ein anderer Stream
+    überwachen (z. B. der TradingStream mit subscribe_trade_updates, `name="trade_updates"`).
+
+    Metriken (Präfix `name`): stream.reconnect (Ausfall bis erste neue Nachricht), stream.gap,
+    stream.backfill; Zähler stream.reconnects, stream.stalls, stream.handler_errors.
+    """
+
+    def __init__(self, stream_factory, handler, symbols, on_gap=None, stall_timeout=STREAM_STALL_TIMEOUT,
+                 check_interval=5, base_delay=1.0, max_delay=60.0, subscribe=None, name="stream"):
+        self.stream_factory = stream_factory
+        self.handler = handler
+        self.symbols = list(symbols)
+        self.on_gap = on_gap
+        self.subscribe = subscribe or (lambda stream, handler: stream.subscribe_trades(handler, *self.symbols))
+        self.name = name
+        self.tag = f"[{name.upper()}]"
+        self.stall_timeout = stall_timeout
+        self.check_interval = check_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stream = None
+        self.running = False
+        self.stop_event = None
+        self.lost = None               # gesetzt, wenn alpaca-py intern neu verbinden will
+        self.last_message = None       # Loop-Zeit der letzten Nachricht
+        self.last_message_wall = None  # Wanduhr-Zeit der letzten Nachricht (für die Lückengröße)
+        self.outage_started = None
+        self.messages = 0
+        self.reconnects = 0
+
+    async def run(self):
+        """Hält den Stream am Laufen, bis stop() aufgerufen wird."""
+        self.running = True
+        self.stop_event = asyncio.Event()
+        attempt = 0
+        while self.running:
+            stream = self.stream_factory()
+            self.subscribe(stream, self._on_message)
+            self.lost = asyncio.Event()
+            self._hook_reconnects(stream)
+            self.stream = stream
+            self.last_message = time.monotonic()  # Stall-Timer läuft ab Verbindungsaufbau
+            messages_before = self.messages
+            # alpaca-py bietet nur run() mit eigenem Event-Loop; die private Coroutine ist hier gekapselt
+            task = asyncio.create_task(stream._run_forever())
+
+            reason = await self._watch(task)
+            await self._close(stream, task)
+            if not self.running:
+                break
+
+            if self.messages > messages_before:
+                attempt = 0  # Verbindung hat geliefert → Backoff von vorn
+            self.reconnects += 1
+            incr(f"{self.name}.reconnects")
+            if self.outage_started is None:
+                self.outage_started = time.monotonic()
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            attempt += 1
+            log.warning("%s %s – neuer Verbindungsaufbau in %.1f s (Versuch %d).", self.tag, reason, delay, attempt)
+            if await self._sleep(delay):
+                break
+            await self._backfill()
+
+    def _hook_reconnects(self, stream):
+        """
+        alpaca-py baut eine verlorene Verbindung intern sofort und ohne Backoff neu auf (bei
+        fehlendem Netz im Dauerlauf). Ab dem zweiten Verbindungsaufbau desselben Streams
+        übernimmt daher der Supervisor: Backoff, Lücke nachladen, frischer Stream.
+        """
+        start_ws = getattr(stream, "_start_ws", None)
+        if start_ws is None:
+            return
+        calls = 0
+
+        async def supervised_start_ws():
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                self.lost.set()
+                await asyncio.Event().wait()  # bis der Supervisor den Task abbricht
+            await start_ws()
+
+        stream._start_ws = supervised_start_ws
+
+    async def _watch(self, task):
+        stop = asyncio.create_task(self.stop_event.wait())
+        lost = asyncio.create_task(self.lost.wait())
+        try:
+            while self.running:
+                done, _ = await asyncio.wait({task, stop, lost}, timeout=self.check_interval,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if task in done:
+                    error = None if task.cancelled() else task.exception()
+                    return f"Stream beendet ({error!r})" if error else "Stream beendet"
+                if lost in done:
+                    return "Verbindung verloren"
+                idle = time.monotonic() - self.last_message
+                if self.stall_timeout and idle > self.stall_timeout:
+                    incr(f"{self.name}.stalls")
+                    return f"Keine Nachricht seit {idle:.0f} s"
+            return "gestoppt"
+        finally:
+            stop.cancel()
+            lost.cancel()
+
+    async def _close(self, stream, task):
+        if not task.done():
+            task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+        try:
+            await stream.close()
+        except Exception as e:
+            log.debug("%s Schließen fehlgeschlagen: %s", self.tag, e)
+
+    async def _sleep(self, delay):
+        """Wartet `delay` Sekunden; gibt True zurück, wenn währenddessen gestoppt wurde."""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=delay)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _backfill(self):
+        if self.on_gap is None or self.last_message_wall is None:
+            return
+        gap = time.time() - self.last_message_wall
+        metrics.observe(f"{self.name}.gap", gap)
+        try:
+            with timer(f"{self.name}.backfill"):
+                await self.on_gap(self.symbols, gap)
+        except Exception as e:
+            log.error("%s Nachladen der Lücke (%.0f s) fehlgeschlagen: %s", self.tag, gap, e)
+
+    async def _on_message(self, data):
+        now = time.monotonic()
+        if self.outage_started is not None:
+            outage = now - self.outage_started
+            metrics.observe(f"{self.name}.reconnect", outage)
+            log.info("%s Wieder verbunden, erste Nachricht nach %.1f s Ausfall.", self.tag, outage)
+            self.outage_started = None
+        self.last_message = now
+        self.last_message_wall = time.time()
+        self.messages += 1
+        try:
+            await self.handler(data)
+        except Exception as e:
+            incr(f"{self.name}.handler_errors")
+            log.exception("%s Handler-Fehler (%s): %s", self.tag, getattr(data, "symbol", "?"), e)
+
+    def stop(self):
+        self.running = False
+        if self.stop_event is not None:
+            self.stop_event.set()
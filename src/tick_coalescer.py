@@ -0,0 +1,105 @@
+import asyncio
+
+from helper.log_utils import get_logger
+
+log = get_logger("coalescer")
+
+
+class TickCoalescer:
+    """
+    Vorstufe vor dem (teuren) Trade-Handler.
+    Jeder Trade läuft durch den billigen `on_tick`-Pfad (z. B. Bar-Aggregation),
+    ausgewertet wird aber nur der jeweils letzte Trade pro Symbol – höchstens
+    einmal pro `interval_ms` oder sofort, wenn `on_tick` einen Bar-Abschluss meldet.
+    So bleibt die Latenz auch bei Trade-Bursts begrenzt, statt mit der Queue zu wachsen.
+
+    `clock` liefert die aktuelle Zeit in Sekunden (Standard: Loop-Zeit). Im Replay ist das die
+    Zeit der Aufzeichnung: dann wird nicht auf die Wanduhr gewartet, sondern ausgewertet, sobald
+    ein Trade das Intervall überschreitet – gleiches Coalescing bei jedem Replay-Tempo.
+
+    Zähler:
+      received  – alle eingegangenen Trades
+      coalesced – Trades, die vor ihrer Auswertung durch einen neueren ersetzt wurden
+      dropped   – Trades, die bei ihrer Auswertung älter als `max_age_ms` waren
+      evaluated – Aufrufe des Handlers
+    """
+
+    def __init__(self, handler, interval_ms=500, on_tick=None, max_age_ms=None, clock=None):
+        self.handler = handler
+        self.clock = clock
+        self.on_tick = on_tick
+        self.interval = interval_ms / 1000
+        self.max_age = max_age_ms / 1000 if max_age_ms else None
+        self.latest = {}     # symbol -> (trade, Empfangszeit)
+        self.last_eval = {}  # symbol -> Loop-Zeit der letzten Auswertung
+        self.tasks = {}
+        self.wake = {}
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.evaluated = 0
+
+    def _now(self):
+        return self.clock() if self.clock else asyncio.get_running_loop().time()
+
+    async def on_trade(self, data):
+        symbol = data.symbol
+        self.received += 1
+
+        bar_closed = bool(self.on_tick(data)) if self.on_tick else False
+
+        if symbol in self.latest:
+            self.coalesced += 1
+        now = self._now()
+        self.latest[symbol] = (data, now)
+
+        if symbol not in self.tasks:
+            self.wake[symbol] = asyncio.Event()
+            self.tasks[symbol] = asyncio.create_task(self._evaluate(symbol))
+        if bar_closed or (self.clock and now >= self.last_eval.get(symbol, float("-inf")) + self.interval):
+            self.wake[symbol].set()
+
+    async def _evaluate(self, symbol):
+        wake = self.wake[symbol]
+        try:
+            while symbol in self.latest:
+                wait = self.last_eval.get(symbol, float("-inf")) + self.interval - self._now()
+                if wait > 0 and not wake.is_set():
+                    if self.clock:
+                        await wake.wait()  # Aufzeichnungszeit: der nächste Trade entscheidet
+                    else:
+                        try:
+                            await asyncio.wait_for(wake.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+                wake.clear()
+
+                data, received_at = self.latest.pop(symbol)
+                now = self._now()
+                self.last_eval[symbol] = now
+                if self.max_age is not None and now - received_at > self.max_age:
+                    self.dropped += 1
+                    continue
+
+                self.evaluated += 1
+                try:
+                    await self.handler(data)
+                except Exception as e:
+                    log.exception("Trade-Handler für %s fehlgeschlagen: %s", symbol, e)
+        finally:
+            self.tasks.pop(symbol, None)
+            self.wake.pop(symbol, None)
+
+    async def flush(self):
+        """Wertet alle noch offenen Trades sofort aus (z. B. am Ende eines Replays)."""
+        for wake in list(self.wake.values()):
+            wake.set()
+        await asyncio.gather(*list(self.tasks.values()), return_exceptions=True)
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "evaluated": self.evaluated,
+        }
@@ -0,0 +1,178 @@
+import csv
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from helper.log_utils import get_logger
+
+# Sinks, kommagetrennt: csv, sqlite, parquet
+JOURNAL_SINKS = os.getenv("JOURNAL_SINKS", "csv")
+JOURNAL_DIR = Path(os.getenv("JOURNAL_DIR", "."))
+
+ORDER_COLUMNS = [
+    "timestamp", "action", "symbol", "quantity", "price",
+    "sentiment", "trend", "invested_usd", "pnl_usd", "cash"
+]
+DECISION_COLUMNS = [
+    "timestamp", "symbol", "trade_time", "price", "trend", "candle", "sentiment", "probability",
+    "position_qty", "decision", "action", "quantity", "reason", "latency_ms"
+]
+STREAMS = {"orders": ORDER_COLUMNS, "decisions": DECISION_COLUMNS}
+
+log = get_logger("journal")
+
+
+class CsvSink:
+    """Hält je Stream eine CSV-Datei offen; Kopfzeile nur bei neuen Dateien."""
+
+    def __init__(self, paths):
+        self.files = {}
+        self.writers = {}
+        for stream, path in paths.items():
+            path = Path(path)
+            new = not path.exists()
+            f = open(path, mode="a", newline="")
+            self.files[stream] = f
+            self.writers[stream] = csv.DictWriter(f, fieldnames=STREAMS[stream], extrasaction="ignore")
+            if new:
+                self.writers[stream].writeheader()
+
+    def write(self, stream, rows):
+        self.writers[stream].writerows(rows)
+        self.files[stream].flush()
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+class SqliteSink:
+    """Eine Tabelle je Stream; pro Batch eine Transaktion."""
+
+    def __init__(self, path):
+        # Zugriff ausschließlich aus dem Writer-Thread, Anlage aber im Konstruktor
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        for stream, columns in STREAMS.items():
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {stream} ({', '.join(columns)})")
+        self.conn.commit()
+
+    def write(self, stream, rows):
+        columns = STREAMS[stream]
+        sql = f"INSERT INTO {stream} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with self.conn:
+            self.conn.executemany(sql, [tuple(row.get(c) for c in columns) for row in rows])
+
+    def close(self):
+        self.conn.close()
+
+
+class ParquetSink:
+    """Schreibt jeden Batch als eigene Parquet-Datei unter <root>/<stream>/ (benötigt pyarrow)."""
+
+    def __init__(self, root):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa, self.pq = pa, pq
+        self.root = Path(root)
+
+    def write(self, stream, rows):
+        directory = self.root / stream
+        directory.mkdir(parents=True, exist_ok=True)
+        columns = STREAMS[stream]
+        table = self.pa.table({c: [_text(row.get(c)) for row in rows] for c in columns})
+        self.pq.write_table(table, directory / f"part-{time.time_ns()}.parquet")
+
+    def close(self):
+        pass
+
+
+def _text(value):
+    # gemischte Typen (z. B. "" und float in pnl_usd) → einheitlich als Text ablegen
+    return None if value is None or value == "" else str(value)
+
+
+def build_sinks(names=JOURNAL_SINKS, root=JOURNAL_DIR, order_log=None):
+    sinks = []
+    for name in (n.strip() for n in names.split(",") if n.strip()):
+        if name == "csv":
+            sinks.append(CsvSink({
+                "orders": order_log or root / "order_log.csv",
+                "decisions": root / "decision_log.csv",
+            }))
+        elif name == "sqlite":
+            sinks.append(SqliteSink(root / "journal.db"))
+        elif name == "parquet":
+            sinks.append(ParquetSink(root / "journal"))
+        else:
+            raise ValueError(f"Unbekannter Journal-Sink: {name}")
+    return sinks
+
+
+class TradeJournal:
+    """
+    Gepuffertes Journal für Orders und Entscheidungen. `record` legt die Zeile nur in eine
+    Queue (kein Disk-I/O im Trade-Handler); ein Hintergrund-Thread schreibt gesammelt,
+    sobald `batch_size` Zeilen anliegen oder `flush_interval` Sekunden vergangen sind.
+    """
+
+    def __init__(self, sinks, batch_size=200, flush_interval=1.0):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.written = 0
+        self.errors = 0
+        self.thread = threading.Thread(target=self._run, name="TradeJournal", daemon=True)
+        self.thread.start()
+
+    def record(self, stream, row):
+        self.queue.put((stream, row))
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    self.queue.task_done()
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+                for _ in batch:
+                    self.queue.task_done()
+        for sink in self.sinks:
+            sink.close()
+
+    def _write(self, batch):
+        by_stream = {}
+        for stream, row in batch:
+            by_stream.setdefault(stream, []).append(row)
+        for sink in self.sinks:
+            for stream, rows in by_stream.items():
+                try:
+                    sink.write(stream, rows)
+                except Exception as e:
+                    self.errors += 1
+                    log.error("Journal (%s/%s): %s", type(sink).__name__, stream, e)
+        self.written += len(batch)
+
+    def flush(self):
+        """Blockiert, bis alle bisher aufgezeichneten Zeilen geschrieben sind."""
+        self.queue.join()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
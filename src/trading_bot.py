@@ -1,136 +1,245 @@
-import os
-import pandas as pd
-import requests
-from alpaca.trading.client import TradingClient
-from alpaca.trading.enums import OrderSide, TimeInForce, OrderType
-from alpaca.trading.requests import MarketOrderRequest
-from dotenv import load_dotenv
+from dataclasses import dataclass
+
+import numpy as np
+from alpaca.trading.enums import OrderClass, OrderSide, TimeInForce, OrderType
+from alpaca.trading.requests import MarketOrderRequest, StopLossRequest, TakeProfitRequest
 from candlestick_patterns import detect_candlestick_pattern
+from bar_aggregator import BarAggregator
+from indicators import IndicatorSet
+from latency import timed
+from helper.config import get_trading_client
+from helper.log_utils import get_logger
+
+log = get_logger("trader")
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """Stellschrauben der Strategie (Defaults = bisherige Werte), z. B. für Parameter-Sweeps."""
+    buy_threshold: float = 2
+    sell_threshold: float = -2
+    trend_weight: float = 1
+    candle_weight: float = 2
+    sentiment_weight: float = 0.5
+    ma_period: int = 20
+    order_cooldown: float = 30  # Sekunden
+    risk_pct: float = 0.02
+    reward_pct: float = 0.04
+    use_brackets: bool = False  # Stop-Loss/Take-Profit aus calculate_risk_levels anwenden
 
-load_dotenv()
 
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
-NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+BULLISH_CANDLES = ["bullish_engulfing", "hammer", "three_white_soldiers"]
+BEARISH_CANDLES = ["bearish_engulfing", "shooting_star", "three_black_crows"]
 
-client = TradingClient(API_KEY, API_SECRET, paper=True)
+# Order-Aktionen aus plan_order → Orderseite und Log-Bezeichnung
+ORDER_SIDES = {"BUY-CLOSE": "buy", "BUY": "buy", "SELL-CLOSE": "sell", "SELL-OPEN": "sell"}
+ORDER_LABELS = {"BUY-CLOSE": "CLOSE SHORT", "BUY": "BUY", "SELL-CLOSE": "SELL", "SELL-OPEN": "OPEN SHORT"}
 
 class MLTrader:
-    def __init__(self, symbol="TSLA", cash_at_risk=0.5):
+    def __init__(self, symbol="TSLA", cash_at_risk=0.5, ledger=None, news_query=None, params=None,
+                 trading_client=None):
         self.symbol = symbol
+        self.params = params or StrategyParams()
+        self.news_query = news_query or symbol
         self.cash_at_risk = cash_at_risk
-        self.client = client
-        self.historical_data = pd.DataFrame()
-        self.ma_period = 20
+        self._client = trading_client
+        self.ledger = ledger
+        self.bar_aggregator = BarAggregator(symbol)
+        self.ma_period = self.params.ma_period
+        self.indicators = IndicatorSet(self.ma_period)
         self.cached_sentiment = None
         self.last_news_update = None
-        self.price_data = []
         self.candles = []
-        self.fetch_all_open_positions()
+        if not ledger:
+            # mit Ledger übernimmt der Bot das einmalige Laden/Loggen der Positionen
+            self.fetch_all_open_positions()
+
+    @property
+    def client(self):
+        # erst beim ersten REST-Zugriff aus der Registry – Backtests mit Ledger brauchen keine API-Keys
+        if self._client is None:
+            self._client = get_trading_client()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @property
+    def historical_data(self):
+        # DataFrame-Kopie der Bars aus dem Ringpuffer (inkl. der aktuell offenen Bar) – für Research
+        return self.bar_aggregator.to_pandas()
+
+    @property
+    def price_data(self):
+        # nur abgeschlossene Bars fließen in die Trendanalyse ein (View auf den Ringpuffer)
+        return self.bar_aggregator.closed_bars()
 
     def fetch_all_open_positions(self):
         try:
-            positions = self.client.get_all_positions()
-            print("[DEBUG] Offene Positionen laut Alpaca:")
+            positions = self.ledger.all_positions() if self.ledger else self.client.get_all_positions()
+            log.info("Offene Positionen laut Alpaca:")
             for pos in positions:
-                print(f"  ➤ {pos.symbol}: {pos.qty} shares @ {pos.avg_entry_price}")
+                log.info("  ➤ %s: %s shares @ %s", pos.symbol, pos.qty, pos.avg_entry_price)
             return positions
         except Exception as e:
-            print(f"[ERROR] Fehler beim Abrufen der Positionen: {e}")
+            log.error("Fehler beim Abrufen der Positionen: %s", e)
             return []
 
+    def seed_bars(self, bars):
+        """Seedet Bar-Puffer und Indikatoren (vektorisiert) aus historischen Bars."""
+        self.bar_aggregator.seed(bars)
+        self.indicators.seed(self.bar_aggregator.closed_bars())
+
+    @timed("trader.update_bars")
+    def update_bars(self, price, size, timestamp):
+        """Rollt die Bars mit einem Trade weiter; bei Bar-Abschluss O(1)-Update der Indikatoren."""
+        closed = self.bar_aggregator.on_trade(price, size, timestamp)
+        if closed is not None:
+            self.indicators.update(closed)
+        return closed
+
     def get_cash(self):
+        if self.ledger:
+            return self.ledger.get_cash()
         return float(self.client.get_account().cash)
 
+    @timed("trader.trend")
     def get_price_trend_from_data(self):
-        window_size = 20
-        window = self.price_data[-window_size:]
-
-        if len(window) < window_size:
-            print("⚠️ Nicht genügend Preisdaten für Trendanalyse.")
-            return None
-
-        try:
-            closes = [entry["close"] for entry in window if "close" in entry]
-            if len(closes) < window_size:
-                print("⚠️ Ungültige Daten im Trendfenster.")
-                return None
-
-            sma = sum(closes) / window_size
-            last_price = closes[-1]
-            trend = "up" if last_price > sma else "down"
-
-            print(f"[Trend] SMA: {sma:.2f}, Letzter Preis: {last_price:.2f} ➜ Trend: {trend}")
-            return trend
-
-        except Exception as e:
-            print(f"❌ Fehler bei Trendanalyse: {e}")
+        # SMA wird pro abgeschlossener Bar inkrementell fortgeschrieben (siehe update_bars)
+        sma = self.indicators.sma.value
+        if sma is None:
+            log.debug("⚠️ Nicht genügend Preisdaten für Trendanalyse (%s).", self.symbol)
             return None
 
-    def get_newsapi_headlines(self, query):
-        url = (
-            f"https://newsapi.org/v2/everything?q={query}&sortBy=publishedAt&language=en&pageSize=10&apiKey={NEWSAPI_KEY}"
-        )
-        response = requests.get(url)
-        articles = response.json().get("articles", [])
-        return [article["title"] for article in articles]
-
-    def create_order(self, symbol, qty, side):
+        last_price = self.indicators.last_close
+        trend = "up" if last_price > sma else "down"
+
+        log.debug("[Trend] SMA: %.2f, Letzter Preis: %.2f ➜ Trend: %s", sma, last_price, trend)
+        return trend
+
+    def create_order(self, symbol, qty, side, client_order_id=None, stop_loss=None, take_profit=None):
+        """Market-Order; mit stop_loss/take_profit als Bracket-Order (Stop und Ziel liegen beim Broker)."""
+        bracket = {}
+        if stop_loss is not None and take_profit is not None:
+            bracket = {
+                "order_class": OrderClass.BRACKET,
+                "stop_loss": StopLossRequest(stop_price=stop_loss),
+                "take_profit": TakeProfitRequest(limit_price=take_profit),
+            }
         return MarketOrderRequest(
             symbol=symbol,
             qty=int(qty),
             side=OrderSide.BUY if side == "buy" else OrderSide.SELL,
             type=OrderType.MARKET,
             time_in_force=TimeInForce.GTC,
+            client_order_id=client_order_id,
+            **bracket,
         )
 
     def submit_order(self, order):
-        self.client.submit_order(order)
+        return self.client.submit_order(order)
 
     def get_position(self):
+        if self.ledger:
+            return self.ledger.get_position(self.symbol)
         try:
             return self.client.get_open_position(self.symbol)
         except:
             return None
 
+    @timed("trader.candle")
     def get_candlestick_signal(self):
-        if self.historical_data is None or len(self.historical_data) < 3:
+        candles = self.bar_aggregator.window(3)
+        if len(candles) < 3:
             return "neutral"
         try:
-            pattern = detect_candlestick_pattern(self.historical_data)
-            print(f"[🕯️ Mustererkennung] Erkanntes Pattern: {pattern}")
+            pattern = detect_candlestick_pattern(candles)
+            log.debug("[🕯️ Mustererkennung] Erkanntes Pattern: %s", pattern)
             return pattern
         except Exception as e:
-            print(f"[Fehler] Candle-Erkennung fehlgeschlagen: {e}")
+            log.warning("Candle-Erkennung fehlgeschlagen: %s", e)
             return "neutral"
 
+    @timed("trader.decision")
     def make_decision(self, sentiment, trend, candle_signal):
+        p = self.params
         score = 0
 
         if trend == "up":
-            score += 1
+            score += p.trend_weight
         elif trend == "down":
-            score -= 1
+            score -= p.trend_weight
 
-        if candle_signal in ["bullish_engulfing", "hammer", "three_white_soldiers"]:
-            score += 2
-        elif candle_signal in ["bearish_engulfing", "shooting_star", "three_black_crows"]:
-            score -= 2
+        if candle_signal in BULLISH_CANDLES:
+            score += p.candle_weight
+        elif candle_signal in BEARISH_CANDLES:
+            score -= p.candle_weight
 
         # Sentiment fließt nur leicht ein
         if sentiment == "positive":
-            score += 0.5
+            score += p.sentiment_weight
         elif sentiment == "negative":
-            score -= 0.5
+            score -= p.sentiment_weight
 
-        if score >= 2:
+        if score >= p.buy_threshold:
             return "buy"
-        elif score <= -2:
+        elif score <= p.sell_threshold:
             return "sell"
         else:
             return "hold"
 
-    def calculate_risk_levels(self, entry_price, risk_pct=0.02, reward_pct=0.04):
+    def make_decisions(self, sentiment, trend, candle_signal):
+        """
+        Vektorisierte Variante von make_decision für ganze Arrays (z. B. im Backtest).
+        sentiment darf ein einzelner Wert oder ein Array sein.
+        """
+        trend = np.asarray(trend, dtype=object)
+        candle_signal = np.asarray(candle_signal, dtype=object)
+        sentiment = np.broadcast_to(np.asarray(sentiment, dtype=object), trend.shape)
+
+        p = self.params
+        score = np.where(trend == "up", p.trend_weight, np.where(trend == "down", -p.trend_weight, 0.0))
+        score += np.where(np.isin(candle_signal, BULLISH_CANDLES), p.candle_weight,
+                          np.where(np.isin(candle_signal, BEARISH_CANDLES), -p.candle_weight, 0.0))
+        score += np.where(sentiment == "positive", p.sentiment_weight,
+                          np.where(sentiment == "negative", -p.sentiment_weight, 0.0))
+
+        return np.where(score >= p.buy_threshold, "buy",
+                        np.where(score <= p.sell_threshold, "sell", "hold")).astype(object)
+
+    def plan_order(self, decision, position_qty, is_short, cash, price):
+        """
+        Übersetzt eine Entscheidung in eine Order-Aktion (gleiche Logik für Live-Bot und Backtest).
+        Gibt (action, quantity, reason) zurück; action ist None, wenn keine Order nötig ist.
+        """
+        if decision == "buy":
+            if is_short:
+                return "BUY-CLOSE", position_qty, None
+            if position_qty == 0:
+                quantity = int(cash // price)
+                if quantity > 0:
+                    return "BUY", quantity, None
+                return None, 0, "[INFO] Nicht genug Kapital zum Kauf."
+
+        elif decision == "sell":
+            if not is_short and position_qty > 0:
+                return "SELL-CLOSE", position_qty, None
+            if position_qty == 0:
+                quantity = int(cash // price)
+                if quantity > 0:
+                    return "SELL-OPEN", quantity, None
+                return None, 0, "[INFO] Nicht genug Kapital für Short-Sell."
+            return None, 0, "[WARNUNG] SELL-Signal aber keine logische Aktion möglich."
+
+        return None, 0, None
+
+    def calculate_risk_levels(self, entry_price, risk_pct=None, reward_pct=None, side="buy"):
+        risk_pct = self.params.risk_pct if risk_pct is None else risk_pct
+        reward_pct = self.params.reward_pct if reward_pct is None else reward_pct
+        if side == "sell":
+            # Short: Stop über, Ziel unter dem Einstieg
+            return round(entry_price * (1 + risk_pct), 2), round(entry_price * (1 - reward_pct), 2)
         stop_loss = entry_price * (1 - risk_pct)
         take_profit = entry_price * (1 + reward_pct)
         return round(stop_loss, 2), round(take_profit, 2)
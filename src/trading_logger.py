@@ -1,26 +1,44 @@
-import csv
+import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
+from helper.log_utils import get_logger, log_event
+from latency import timed
+from trade_journal import ORDER_COLUMNS, TradeJournal, build_sinks
+
 
 LOG_FILE = Path("order_log.csv")
 
+CANDLE_EMOJIS = {
+    "hammer": "🔨",
+    "shooting_star": "⭐",
+    "bullish_engulfing": "🟩",
+    "bearish_engulfing": "🟥",
+    "morning_star": "🌅",
+    "three_white_soldiers": "⬜",
+    "three_black_crows": "⬛",
+    "neutral": "⚪"
+}
+DECISION_LABELS = {
+    "buy": "🟢 KAUFEN",
+    "sell": "🔴 VERKAUFEN",
+    "hold": "🟡 HALTEN"
+}
+
+log = get_logger("trade_logger")
+
 
 class TradeLogger:
-    def __init__(self, log_file):
-        self.remember_decision = ""
+    def __init__(self, log_file, journal=None):
+        self.remember_decision = {}  # letzte Entscheidung je Symbol
         self.log_file = log_file
         self.positions = {}  # Track open positions per symbol
-        self._init_log_file()
+        # Zeilen gehen gepuffert an das Journal (Hintergrund-Thread), kein open() pro Zeile
+        self.journal = journal or TradeJournal(build_sinks(order_log=log_file))
 
-    def _init_log_file(self):
-        if not self.log_file.exists():
-            with open(self.log_file, mode="w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "timestamp", "action", "symbol", "quantity", "price",
-                    "sentiment", "trend", "invested_usd", "pnl_usd", "cash"
-                ])
+    def _write_order(self, row):
+        self.journal.record("orders", dict(zip(ORDER_COLUMNS, row)))
 
     def log_initial_positions(self, cash):
         for symbol, pos in self.positions.items():
@@ -37,11 +55,10 @@ class TradeLogger:
                 "",  # kein PnL, da nichts geschlossen wurde
                 cash
             ]
-            with open(self.log_file, mode="a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(writerow)
-            print(f"[Logger] Initiale Position geloggt für {symbol}: {writerow}")
+            self._write_order(writerow)
+            log.info("[Logger] Initiale Position geloggt für %s: %s", symbol, writerow)
 
+    @timed("logger.log")
     def log(self, action, symbol, qty, price, sentiment, trend, cash):
         timestamp = datetime.utcnow().isoformat()
         invested = 0
@@ -50,65 +67,76 @@ class TradeLogger:
         if action in ("BUY", "SELL-OPEN"):
             invested = round(qty * price, 2)
             self.positions[symbol] = {"qty": qty, "price": price, "invested": invested}
-            print(f"[📄 LOG] Neuer Trade: {action} | Investiert: ${invested}")
+            log.info("[📄 LOG] Neuer Trade: %s | Investiert: $%s", action, invested)
         elif action in ("SELL-CLOSE", "BUY-CLOSE"):
             entry = self.positions.get(symbol, {})
             invested = entry.get("invested", 0)
             pnl = round(qty * price - invested, 2) if action.startswith("SELL") else round(invested - qty * price, 2)
-            print(f"[📄 LOG] Position geschlossen: {action} | PnL: ${pnl}")
+            log.info("[📄 LOG] Position geschlossen: %s | PnL: $%s", action, pnl)
             self.positions.pop(symbol, None)
 
-        with open(self.log_file, mode="a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                timestamp, action, symbol, qty, price, sentiment, trend,
-                invested, pnl, cash
-            ])
-
-    def generate_info_log(self, price, trend, candle_signal, sentiment, position, decision):
-
-        if self.remember_decision != decision and decision is not None:
-            self.remember_decision = decision
-            print("\n========== 📊 INFO LOG ==========")
-
-            # Preis und Trend
-            print(f"💵 Preis: {price:.2f}")
-            trend_symbol = "⬆️" if trend == "up" else "⬇️" if trend == "down" else "➖"
-            print(f"📈 Trend: {trend_symbol} ({trend})")
-
-            # Kerzenanalyse
-            candle_emojis = {
-                "hammer": "🔨",
-                "shooting_star": "⭐",
-                "bullish_engulfing": "🟩",
-                "bearish_engulfing": "🟥",
-                "neutral": "⚪"
-            }
-            candle_desc = candle_emojis.get(candle_signal, "❓")
-            print(f"🕯️ Candle-Pattern: {candle_desc} ({candle_signal})")
-
-            # Sentiment
-            sentiment_symbol = "😊" if sentiment == "positive" else "😐" if sentiment == "neutral" else "☹️"
-            print(f"📰 Sentiment: {sentiment_symbol} ({sentiment})")
-
-            # Offene Position
-            if position:
-                qty = abs(float(position.qty))
-                direction = "Long 📈" if float(position.qty) > 0 else "Short 📉"
-                print(f"📌 Aktuelle Position: {qty} Stück ({direction})")
-            else:
-                print("📌 Aktuelle Position: ❌ Keine")
-
-            # Entscheidung
-            decision_symbols = {
-                "buy": "🟢 KAUFEN",
-                "sell": "🔴 VERKAUFEN",
-                "hold": "🟡 HALTEN"
-            }
-            if decision is not None:
-                symbol = decision_symbols.get(decision, decision.upper())
-                print(f"🤖 Entscheidung: {symbol}")
-            else:
-                print("🤖 Entscheidung: ❓ (noch keine Entscheidung getroffen)")
-
-            print("==================================\n")
+        self._write_order([
+            timestamp, action, symbol, qty, price, sentiment, trend,
+            invested, pnl, cash
+        ])
+
+    @timed("logger.log_decision")
+    def log_decision(self, symbol, price, trend, candle_signal, sentiment, probability, position_qty,
+                     decision, action=None, quantity=0, reason=None, trade_time=None, started=None):
+        """Jede Entscheidung (auch HOLD/Cooldown) mit Eingangsgrößen und Latenz ins Journal."""
+        self.journal.record("decisions", {
+            "timestamp": datetime.utcnow().isoformat(),
+            "symbol": symbol,
+            "trade_time": trade_time.isoformat() if trade_time else None,
+            "price": price,
+            "trend": trend,
+            "candle": candle_signal,
+            "sentiment": sentiment,
+            "probability": round(probability, 4) if probability is not None else None,
+            "position_qty": position_qty,
+            "decision": decision,
+            "action": action,
+            "quantity": quantity,
+            "reason": reason,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3) if started else None,
+        })
+
+    def close(self):
+        self.journal.close()
+
+    @timed("logger.info_log")
+    def generate_info_log(self, price, trend, candle_signal, sentiment, position, decision, symbol=None):
+        # Block wird nur bei geänderter Entscheidung (und aktivem INFO-Level) überhaupt aufgebaut
+        if decision is None or self.remember_decision.get(symbol) == decision or not log.isEnabledFor(logging.INFO):
+            return
+        self.remember_decision[symbol] = decision
+        lines = [f"========== 📊 INFO LOG {symbol or ''} =========="]
+
+        # Preis und Trend
+        lines.append(f"💵 Preis: {price:.2f}")
+        trend_symbol = "⬆️" if trend == "up" else "⬇️" if trend == "down" else "➖"
+        lines.append(f"📈 Trend: {trend_symbol} ({trend})")
+
+        # Kerzenanalyse
+        candle_desc = CANDLE_EMOJIS.get(candle_signal, "❓")
+        lines.append(f"🕯️ Candle-Pattern: {candle_desc} ({candle_signal})")
+
+        # Sentiment
+        sentiment_symbol = "😊" if sentiment == "positive" else "😐" if sentiment == "neutral" else "☹️"
+        lines.append(f"📰 Sentiment: {sentiment_symbol} ({sentiment})")
+
+        # Offene Position
+        position_qty = float(position.qty) if position else 0
+        if position:
+            direction = "Long 📈" if position_qty > 0 else "Short 📉"
+            lines.append(f"📌 Aktuelle Position: {abs(position_qty)} Stück ({direction})")
+        else:
+            lines.append("📌 Aktuelle Position: ❌ Keine")
+
+        # Entscheidung
+        lines.append(f"🤖 Entscheidung: {DECISION_LABELS.get(decision, decision.upper())}")
+        lines.append("==================================")
+
+        log_event(log, logging.INFO, "\n".join(lines), event="decision_changed", symbol=symbol, price=price,
+                  trend=trend, candle=candle_signal, sentiment=sentiment, position_qty=position_qty,
+                  decision=decision)
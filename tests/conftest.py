@@ -0,0 +1,36 @@
+"""
+Gemeinsame Test-Umgebung: Dummy-Keys (keine Requests), Journal in ein Temp-Verzeichnis,
+keine Metriken-Ausgabe und kein Sentiment-Dienst – muss vor den Bot-Imports gesetzt sein.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+FIXTURES = Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures"
+
+os.environ.setdefault("API_KEY", "test")
+os.environ.setdefault("API_SECRET", "test")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_FORMAT", "text")
+os.environ.setdefault("JOURNAL_DIR", tempfile.mkdtemp(prefix="mi_trade_test_"))
+os.environ.setdefault("METRICS_INTERVAL", "0")
+os.environ.setdefault("SENTIMENT_SERVICE", "off")
+
+
+@pytest.fixture
+def fixture_bars():
+    return pd.read_csv(FIXTURES / "bars_TSLA_5min.csv", parse_dates=["timestamp"])
+
+
+@pytest.fixture
+def registry():
+    """Überschreibt Clients in helper.config und stellt den alten Zustand danach wieder her."""
+    from helper import config
+
+    saved = dict(config._clients)
+    yield config
+    config._clients.clear()
+    config._clients.update(saved)
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from bar_aggregator import BAR_DTYPE
+from candlestick_patterns import PATTERNS, detect_candlestick_pattern, detect_candlestick_patterns
+
+
+def random_bars(n, seed=3):
+    """Kleine Körper/Dochte um wenige Preisstufen → alle Muster (und Gleichstände) kommen vor."""
+    rng = np.random.default_rng(seed)
+    o = rng.integers(95, 105, n).astype(float)
+    c = o + rng.integers(-4, 5, n)
+    h = np.maximum(o, c) + rng.integers(0, 5, n)
+    low = np.minimum(o, c) - rng.integers(0, 5, n)
+    return pd.DataFrame({"timestamp": np.arange(n), "open": o, "high": h, "low": low, "close": c,
+                         "volume": 1.0})
+
+
+def test_single_bar_path_matches_vectorized_scan(fixture_bars):
+    for bars in (random_bars(2000), fixture_bars):
+        expected = detect_candlestick_patterns(bars)
+        structured = np.zeros(len(bars), dtype=BAR_DTYPE)
+        for col in ("open", "high", "low", "close"):
+            structured[col] = bars[col]
+
+        for i in range(len(bars)):
+            assert detect_candlestick_pattern(bars.iloc[:i + 1]) == expected[i]
+            assert detect_candlestick_pattern(structured[:i + 1]) == expected[i]
+    assert set(detect_candlestick_patterns(random_bars(2000))) == set(PATTERNS) | {"neutral"}
@@ -0,0 +1,19 @@
+import logging
+import queue
+
+from helper.log_utils import JsonFormatter, RawQueueHandler
+
+
+def test_args_are_snapshotted_before_enqueueing():
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("mi_trade_test.queue")
+    logger.propagate = False
+    logger.addHandler(RawQueueHandler(log_queue))
+
+    position = {"qty": 10}
+    logger.warning("Position %s", position)
+    position["qty"] = 0  # nach dem Aufruf geändert, bevor der Listener formatiert
+
+    record = log_queue.get_nowait()
+    assert record.getMessage() == "Position {'qty': 10}"
+    assert '"msg": "Position {\'qty\': 10}"' in JsonFormatter().format(record)
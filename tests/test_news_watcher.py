@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from news_watcher import NewsWatcher
+
+    return NewsWatcher([SimpleNamespace(symbol="TSLA", news_query="Tesla")])
+
+
+def test_fresh_news_polls_faster_than_daily_mean_while_tokens_last(watcher):
+    budget = watcher.news_client.budget
+    assert watcher.next_interval(fresh=True) == watcher.min_interval < budget.interval
+
+    watcher.market_open = True
+    watcher.current_interval = watcher.market_interval
+    assert watcher.next_interval(fresh=False) == watcher.market_interval < budget.interval
+
+
+def test_empty_bucket_waits_for_the_next_token(watcher):
+    budget = watcher.news_client.budget
+    budget.tokens = 0
+    assert watcher.next_interval(fresh=True) == pytest.approx(budget.interval, rel=1e-3)
@@ -0,0 +1,21 @@
+import numpy as np
+
+from backtester import Backtester
+from param_sweep import run_sweep
+from trading_bot import StrategyParams
+
+
+def test_one_config_sweep_matches_backtester_with_sentiment(fixture_bars):
+    rng = np.random.default_rng(7)
+    bars = fixture_bars.assign(sentiment=rng.choice(["positive", "negative", "neutral"], len(fixture_bars)))
+    params = StrategyParams()
+
+    direct = Backtester("TSLA", params=params).run(bars).summary()
+    neutral = Backtester("TSLA", params=params).run(bars.drop(columns="sentiment")).summary()
+    assert direct != neutral  # sonst prüft der Test nicht, ob das Sentiment ankommt
+
+    report = run_sweep({"TSLA": bars}, {"ma_period": [params.ma_period]}, workers=1)
+    row = report.iloc[0]
+    assert row["orders"] == direct["orders"]
+    assert row["return_pct"] == direct["return_pct"]
+    assert row["realized_pnl"] == direct["realized_pnl"]
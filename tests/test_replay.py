@@ -0,0 +1,38 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+FIXTURES = Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures"
+
+
+def run_replay(tmp_path, bars, registry, speed=0):
+    import live_websocket_bot as lwb
+    from market_replay import Recording, ReplayClient, ReplayStream, convert_trades
+
+    path = tmp_path / "trades.jsonl.gz"
+    if not path.exists():
+        convert_trades(FIXTURES / "trades_TSLA.csv.gz", path, "TSLA")
+    recording = Recording.load(path)
+    stream = registry.override("stream", ReplayStream(recording, speed))
+    client = registry.override("trading", ReplayClient(recording, stream, defaults={
+        "get_all_positions": [], "get_account": SimpleNamespace(cash="100000"), "get_orders": []}))
+    registry.override("bar_store", ReplayClient(recording, defaults={"get_bars": bars}))
+
+    bot = lwb.LiveWebSocketBot(replay=True)
+    client.ledger = bot.ledger
+    asyncio.run(bot.start())
+    bot.stop()
+    return bot, client
+
+
+def test_replay_places_orders_on_recording_time(tmp_path, monkeypatch, fixture_bars, registry):
+    monkeypatch.chdir(tmp_path)
+    bot, client = run_replay(tmp_path, fixture_bars, registry)
+
+    # ~2 h Aufzeichnung bei 30 s Cooldown: mehr als eine Order, obwohl --speed 0 in Sekunden durchläuft
+    assert len(client.orders) > 1
+    assert bot.coalescer.evaluated > 1000
+
+    # gleiche Aufzeichnung → gleiche Orders
+    _, again = run_replay(tmp_path, fixture_bars, registry)
+    assert [(o.side, o.qty) for o in again.orders] == [(o.side, o.qty) for o in client.orders]